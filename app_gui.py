@@ -1,34 +1,86 @@
 import sys
+import threading
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QHBoxLayout, QLabel,
-    QLineEdit, QPushButton, QMessageBox, QFrame, QGraphicsDropShadowEffect
+    QLineEdit, QPushButton, QMessageBox, QFrame, QGraphicsDropShadowEffect,
+    QProgressBar, QCheckBox, QGridLayout
 )
 from PyQt5.QtCore import Qt, QThread, pyqtSignal
 from PyQt5.QtGui import QFont, QPixmap, QPainter, QBrush, QPen, QColor, QIcon
-from gui_config.scraper_main import lancer_scraping
+
+# Champs proposés à l'extraction (ProductInfoScraper.FIELDS), le nom étant toujours gardé
+FIELD_CHOICES = [
+    ("address", "Adresse"),
+    ("phone", "Téléphone"),
+    ("authority", "Site web"),
+    ("rating", "Note"),
+    ("number_of_rates", "Nombre d'avis"),
+    ("details", "Informations détaillées"),
+]
 
 class ScraperThread(QThread):
     finished = pyqtSignal()
     error = pyqtSignal(str)
+    progress = pyqtSignal(dict)
 
-    def __init__(self, keyword, key):
+    def __init__(self, keyword, key, fields=None):
         super().__init__()
         self.keyword = keyword
         self.key = key
+        self.fields = fields
+        self.stop_event = threading.Event()
+
+    def cancel(self):
+        """Ask the pipeline to stop after the current place; the browser is closed cleanly."""
+        self.stop_event.set()
+
+    def is_cancelled(self):
+        return self.stop_event.is_set()
 
     def run(self):
         try:
-            lancer_scraping(self.keyword, self.key)
+            # Import différé : la fenêtre s'affiche sans attendre selenium
+            from gui_config.scraper_main import lancer_scraping
+            lancer_scraping(
+                self.keyword, self.key,
+                progress_callback=self.progress.emit,
+                stop_event=self.stop_event,
+                fields=self.fields,
+            )
             self.finished.emit()
         except Exception as e:
             self.error.emit(str(e))
 
 
+def format_progress(event):
+    """Human-readable status line for a progress event from the pipeline."""
+    stage = event.get("stage")
+    if stage == "search":
+        return "Ouverture de Google Maps..."
+    if stage == "scroll":
+        return f"Chargement des résultats ({event['loop']}/{event['max_loops']})..."
+    if stage == "links":
+        return f"{event['found']} lieux trouvés"
+    if stage == "places":
+        text = f"Lieux : {event['done']}/{event['total']}"
+        if event.get("rate"):
+            text += f" — {event['rate']:.2f} lieux/s"
+        if event.get("eta") is not None:
+            minutes, seconds = divmod(int(event["eta"]), 60)
+            text += f" — reste ~{minutes}m{seconds:02d}s"
+        return text
+    if stage == "closing":
+        return "Fermeture du navigateur..."
+    if stage == "normalizing":
+        return "Normalisation des données..."
+    return ""
+
+
 class ScraperApp(QWidget):
     def __init__(self):
         super().__init__()
         self.init_ui()
-        self.scraper_thread = 3
+        self.scraper_thread = None
 
     def center_on_screen(self):
         frame_geometry = self.frameGeometry()
@@ -199,9 +251,65 @@ class ScraperApp(QWidget):
 
         layout.addWidget(title)
         layout.addWidget(description)
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setTextVisible(False)
+        self.progress_bar.setFixedHeight(10)
+        self.progress_bar.hide()
+        self.progress_bar.setStyleSheet("""
+            QProgressBar {
+                background: rgba(255, 255, 255, 0.15);
+                border: none;
+                border-radius: 5px;
+                padding: 0px;
+            }
+            QProgressBar::chunk {
+                background: #3ecf8e;
+                border-radius: 5px;
+            }
+        """)
+
+        self.cancel_button = QPushButton("⏹ Annuler")
+        self.cancel_button.clicked.connect(self.cancel_scraper)
+        self.cancel_button.hide()
+        self.cancel_button.setStyleSheet("""
+            QPushButton {
+                background: rgba(255, 255, 255, 0.1);
+                color: white;
+                font-size: 14px;
+                padding: 10px;
+                border: 1px solid rgba(255, 255, 255, 0.3);
+                border-radius: 12px;
+            }
+            QPushButton:hover {
+                background: rgba(255, 255, 255, 0.2);
+            }
+            QPushButton:disabled {
+                color: #aaa;
+            }
+        """)
+
+        # Champs à extraire : décocher "Informations détaillées" évite l'étape la plus lente
+        fields_layout = QGridLayout()
+        self.field_boxes = {}
+        for i, (field, label) in enumerate(FIELD_CHOICES):
+            box = QCheckBox(label)
+            box.setChecked(True)
+            box.setStyleSheet("""
+                QCheckBox {
+                    color: rgba(255, 255, 255, 0.85);
+                    font-size: 13px;
+                    background: none;
+                }
+            """)
+            self.field_boxes[field] = box
+            fields_layout.addWidget(box, i // 3, i % 3)
+
         layout.addWidget(self.input)
+        layout.addLayout(fields_layout)
         layout.addWidget(self.button)
+        layout.addWidget(self.progress_bar)
         layout.addWidget(self.status_label)
+        layout.addWidget(self.cancel_button)
 
         return card_frame
 
@@ -228,26 +336,58 @@ class ScraperApp(QWidget):
             self.show_message("Erreur", "Veuillez entrer un mot-clé.", "warning")
             return
 
+        fields = [field for field, box in self.field_boxes.items() if box.isChecked()]
+        if not fields:
+            self.show_message("Erreur", "Sélectionnez au moins un champ à extraire.", "warning")
+            return
+        if len(fields) == len(FIELD_CHOICES):
+            fields = None  # tous les champs : pas de projection
+
         self.button.setEnabled(False)
         self.button.setText("⏳ Scraping en cours...")
         self.status_label.setText("Extraction des données en cours...")
+        self.progress_bar.setRange(0, 0)  # indéterminé jusqu'à connaître le nombre de lieux
+        self.progress_bar.show()
+        self.cancel_button.setEnabled(True)
+        self.cancel_button.show()
 
         # ➕ Passe keyword ET key au thread
-        self.scraper_thread = ScraperThread(keyword, key)
+        self.scraper_thread = ScraperThread(keyword, key, fields)
         self.scraper_thread.finished.connect(self.on_scraping_finished)
         self.scraper_thread.error.connect(self.on_scraping_error)
+        self.scraper_thread.progress.connect(self.on_scraping_progress)
         self.scraper_thread.start()
 
-
-    def on_scraping_finished(self):
+    def cancel_scraper(self):
+        if self.scraper_thread and self.scraper_thread.isRunning():
+            self.scraper_thread.cancel()
+            self.cancel_button.setEnabled(False)
+            self.status_label.setText("Annulation après le lieu en cours...")
+
+    def on_scraping_progress(self, event):
+        if event.get("stage") == "places" and event.get("total"):
+            self.progress_bar.setRange(0, event["total"])
+            self.progress_bar.setValue(event["done"])
+        text = format_progress(event)
+        if text and not self.scraper_thread.is_cancelled():
+            self.status_label.setText(text)
+
+    def reset_controls(self):
         self.button.setEnabled(True)
         self.button.setText("🚀 Lancer le scraping")
+        self.progress_bar.hide()
+        self.cancel_button.hide()
+
+    def on_scraping_finished(self):
+        self.reset_controls()
+        if self.scraper_thread.is_cancelled():
+            self.status_label.setText("⏹ Scraping annulé, résultats partiels enregistrés.")
+            return
         self.status_label.setText("✅ Scraping terminé avec succès!")
         self.show_message("Succès", f"Scraping terminé pour '{self.input.text()}'", "success")
 
     def on_scraping_error(self, error_msg):
-        self.button.setEnabled(True)
-        self.button.setText("🚀 Lancer le scraping")
+        self.reset_controls()
         self.status_label.setText("❌ Erreur lors du scraping")
         self.show_message("Erreur", error_msg, "error")
 
@@ -292,7 +432,11 @@ class ScraperApp(QWidget):
                                        QMessageBox.No)
             
             if reply == QMessageBox.Yes:
-                self.scraper_thread.terminate()
+                # Arrêt coopératif : le thread quitte Chrome lui-même (driver.quit())
+                self.scraper_thread.cancel()
+                self.status_label.setText("Fermeture du navigateur...")
+                QApplication.processEvents()
+                self.scraper_thread.wait()
                 event.accept()
             else:
                 event.ignore()
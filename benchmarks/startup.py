@@ -0,0 +1,164 @@
+"""Startup benchmark for the API and the desktop GUI.
+
+Measures, each in a fresh interpreter:
+  * the import-time profile of `main` and `app_gui` (python -X importtime),
+  * the time until uvicorn answers its first HTTP request,
+  * the time until the GUI window is shown.
+
+Exits with status 1 when a measurement exceeds its budget, so it can be run
+as a regression check:  python benchmarks/startup.py [--runs 3]
+"""
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Budgets in seconds (best of N runs)
+BUDGETS = {
+    "import main": 1.0,
+    "import app_gui": 0.8,
+    "uvicorn first response": 3.0,
+    "gui window shown": 2.0,
+}
+
+# Modules that must not be loaded while importing the entry points
+FORBIDDEN_AT_IMPORT = ("selenium", "webdriver_manager", "scraper.product_info_scraper")
+
+
+def import_profile(module):
+    """Return (total seconds, {module: cumulative µs}) from -X importtime."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr[-500:]}")
+    cumulative = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        try:
+            _, cum, name = [part.strip() for part in line[len("import time:"):].split("|")]
+            cumulative[name] = int(cum)
+        except ValueError:
+            continue  # ligne d'en-tête
+    return cumulative.get(module, 0) / 1e6, cumulative
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def uvicorn_first_response(timeout=30):
+    port = _free_port()
+    started = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            if proc.poll() is not None:
+                raise RuntimeError(f"uvicorn exited:\n{proc.stderr.read().decode()[-500:]}")
+            try:
+                urllib.request.urlopen(f"http://127.0.0.1:{port}/openapi.json", timeout=1).read()
+                return time.perf_counter() - started
+            except OSError:
+                time.sleep(0.02)
+        raise RuntimeError("uvicorn did not answer in time")
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+GUI_PROBE = """
+import sys
+from PyQt5.QtWidgets import QApplication
+from PyQt5.QtCore import QTimer
+import app_gui
+app = QApplication(sys.argv)
+window = app_gui.ScraperApp()
+window.show()
+def shown():
+    print("shown", flush=True)
+    app.quit()
+QTimer.singleShot(0, shown)
+app.exec_()
+"""
+
+
+def gui_time_to_window(timeout=30):
+    env = dict(os.environ, QT_QPA_PLATFORM=os.environ.get("QT_QPA_PLATFORM", "offscreen"))
+    started = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-c", GUI_PROBE],
+        cwd=ROOT, env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True,
+    )
+    try:
+        line = proc.stdout.readline()
+        elapsed = time.perf_counter() - started
+        if line.strip() != "shown":
+            raise RuntimeError(f"GUI probe failed:\n{proc.stderr.read()[-500:]}")
+        return elapsed
+    finally:
+        proc.wait(timeout=timeout)
+
+
+def best_of(runs, fn):
+    return min(fn() for _ in range(runs))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=10, help="slowest imports to list")
+    args = parser.parse_args()
+
+    results = {}
+    failures = []
+
+    for module in ("main", "app_gui"):
+        try:
+            profiles = [import_profile(module) for _ in range(args.runs)]
+        except RuntimeError as e:
+            print(f"[skip] import {module}: {e}")
+            continue
+        total, cumulative = min(profiles, key=lambda p: p[0])
+        results[f"import {module}"] = total
+        print(f"\nimport {module}: {total * 1000:.0f} ms — slowest imports:")
+        for name, cum in sorted(cumulative.items(), key=lambda kv: kv[1], reverse=True)[1:args.top + 1]:
+            print(f"  {cum / 1000:8.1f} ms  {name}")
+        loaded = [m for m in FORBIDDEN_AT_IMPORT if m in cumulative]
+        if loaded:
+            failures.append(f"import {module} loads {', '.join(loaded)}")
+
+    for label, fn in (("uvicorn first response", uvicorn_first_response),
+                      ("gui window shown", gui_time_to_window)):
+        try:
+            results[label] = best_of(args.runs, fn)
+        except (RuntimeError, subprocess.TimeoutExpired) as e:
+            print(f"[skip] {label}: {e}")
+
+    print("\nBudgets:")
+    for label, value in results.items():
+        budget = BUDGETS[label]
+        status = "ok" if value <= budget else "OVER"
+        print(f"  {label:<24} {value * 1000:8.0f} ms  (budget {budget * 1000:.0f} ms)  {status}")
+        if value > budget:
+            failures.append(f"{label} over budget")
+
+    if failures:
+        print("\nRegressions:\n  " + "\n  ".join(failures))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Compare single-tab and tab-multiplexed detail scraping.
+
+Runs ProductInfoScraper over the first N links of the latest out/products_*.json
+once per tab count, each time in a fresh browser and an empty output folder,
+and prints places/s and the browser's memory (RSS of the Chrome process tree,
+when psutil is installed).
+
+    python benchmarks/tabs.py --limit 30 --tabs 1 4
+"""
+import argparse
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from config import settings
+from scraper.driver_factory import DriverFactory
+from scraper.pacing import PacingController
+from scraper.product_info_scraper import ProductInfoScraper
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+def browser_rss_mb(driver):
+    if psutil is None:
+        return None
+    try:
+        root = psutil.Process(driver.service.process.pid)
+        procs = [root] + root.children(recursive=True)
+        return sum(p.memory_info().rss for p in procs if p.is_running()) / 2**20
+    except psutil.Error:
+        return None
+
+
+def run_once(tabs, limit, logger):
+    driver = DriverFactory.create()
+    try:
+        with tempfile.TemporaryDirectory() as output_folder:
+            pacing = PacingController(logger, initial_delay=0, max_workers=tabs)
+            scraper = ProductInfoScraper(
+                driver, "bench", logger,
+                input_folder=str(settings.ensure_output_dir()),
+                output_folder=output_folder,
+                pacing=pacing,
+                tabs=tabs,
+            )
+            scraper.links = scraper.links[:limit]
+            started = time.perf_counter()
+            scraper.scrape_info()
+            elapsed = time.perf_counter() - started
+            rss = browser_rss_mb(driver)
+            return len(scraper.results), elapsed, rss
+    finally:
+        driver.quit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--limit", type=int, default=20, help="places per run")
+    parser.add_argument("--tabs", type=int, nargs="+", default=[1, 4])
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    logger = logging.getLogger("bench")
+
+    print(f"{'tabs':>4}  {'places':>6}  {'seconds':>8}  {'places/s':>8}  {'RSS MB':>7}")
+    for tabs in args.tabs:
+        places, elapsed, rss = run_once(tabs, args.limit, logger)
+        rate = places / elapsed if elapsed else 0.0
+        rss_text = f"{rss:7.0f}" if rss is not None else "    n/a"
+        print(f"{tabs:>4}  {places:>6}  {elapsed:8.1f}  {rate:8.2f}  {rss_text}")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,12 +6,67 @@ WINDOW_SIZE       = (1920, 1080)
 SCROLL_INCREMENT  = 400        # px
 SCROLL_PAUSE_SEC  = 0.8
 MAX_SCROLL_LOOPS  = 60
+PRUNE_FEED        = False      # harvest links while scrolling and detach processed feed entries
+PRUNE_KEEP_LAST   = 10         # feed entries left in place for Maps' pagination
+DETAIL_TABS       = 1          # >1: pipeline place pages over several tabs of one browser
+
+# --- Browser backend ---
+DRIVER_BACKEND    = "selenium"  # "cdp": asyncio DevTools backend (scraper/cdp_driver.py)
+CDP_PAGES         = 8          # concurrent pages of the CDP backend (capped by pacing workers)
+CHROME_BINARY     = None       # CDP backend: path to Chrome, looked up on PATH when None
+
+# --- Browser watchdog (scraper/driver_watchdog.py) ---
+PAGE_LOAD_TIMEOUT_SEC    = 30
+WATCHDOG_MAX_PAGES       = 200
+WATCHDOG_MAX_RSS_MB      = 1500
+WATCHDOG_RSS_CHECK_EVERY = 5       # pages
+
+# --- Adaptive pacing (scraper/pacing.py) ---
+PACING_INITIAL_DELAY_SEC = 1.0     # pause between two place pages
+PACING_MIN_DELAY_SEC     = 0.2
+PACING_MAX_DELAY_SEC     = 30.0
+PACING_MIN_WORKERS       = 1
+PACING_MAX_WORKERS       = 4
+PACING_WINDOW            = 10      # clean pages before speeding up
+WAIT_BUDGETS_SEC         = {"page": 15, "element": 5, "details": 5}
+
+# --- HTTP-first place fetcher (scraper/http_fetcher.py) ---
+HTTP_FIRST        = True
+HTTP_TIMEOUT_SEC  = 10
+HTTP_POOL_SIZE    = 8
+HTTP_HEADERS      = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+                  "(KHTML, like Gecko) Chrome/126.0 Safari/537.36",
+    "Accept-Language": "fr-FR,fr;q=0.9",
+}
 
 # --- Google Maps query ---
 def get_search_url(key: str) -> str:
     return f"https://www.google.com/maps/search/{key}/@34.0150613,-6.8471705,10z?entry=ttu&g_ep=EgoyMDI1MDczMC4wIKXMDSoASAFQAw%3D%3D"
 
+def get_tile_search_url(key: str, lat: float, lng: float, zoom: int) -> str:
+    return f"https://www.google.com/maps/search/{key}/@{lat},{lng},{zoom}z?entry=ttu"
+
+# --- Retry queue (scraper/retry_queue.py) ---
+RETRY_FAILED        = True
+RETRY_MAX_WAIT_SEC  = 600      # backoff waited at the end of a job before leaving the rest
+
+# --- Distributed work queue (python -m scraper.worker) ---
+QUEUE_URL            = "sqlite:///out/queue.db"
+QUEUE_LEASE_SEC      = 120
+QUEUE_HEARTBEAT_SEC  = 30
+QUEUE_RETRY_DELAY_SEC = 60
+QUEUE_POLL_SEC       = 5       # attente d'un worker quand rien n'est libre
+
 
 # --- Output ---
 OUTPUT_DIR = Path(__file__).resolve().parent.parent / "out"
-OUTPUT_DIR.mkdir(exist_ok=True)
\ No newline at end of file
+
+# Raw DOM snapshots for offline re-extraction (python -m scraper.reextract <key>)
+SNAPSHOTS    = False
+SNAPSHOT_DIR = OUTPUT_DIR / "snapshots"
+
+def ensure_output_dir() -> Path:
+    """Create the output directory on first use rather than at import time."""
+    OUTPUT_DIR.mkdir(exist_ok=True)
+    return OUTPUT_DIR
@@ -1,34 +1,117 @@
-from scraper.driver_factory import DriverFactory
+import asyncio
+import logging
+import os
+
+from scraper.driver_watchdog import DriverWatchdog
 from scraper.scroll_manager import ScrollManager
 from scraper.products import ProductExtractor
 from scraper.product_info_scraper import ProductInfoScraper
 from scraper.product_normalizer import ProductNormalizer
+from scraper.change_detector import ChangeDetector
+from scraper.progress import ProgressTracker
+from scraper.pacing import PacingController
+from scraper.http_fetcher import HttpPlaceFetcher
+from scraper.snapshot_store import SnapshotStore
+from scraper.retry_queue import RetryQueue
+from scraper.cdp_driver import CDPScraper
 from config import settings
 
-def lancer_scraping(keyword: str, key: str, skip_extraction: bool = False):
-    driver = DriverFactory.create()
+logger = logging.getLogger("scraper")
+
+def lancer_scraping(keyword: str, key: str, skip_extraction: bool = False,
+                    progress_callback=None, stop_event=None, fields=None):
+    """Run the full pipeline; `stop_event` stops it between places and keeps partial results.
+
+    `fields` limits extraction to these fields (see ProductInfoScraper.FIELDS); None means all.
+    """
+    settings.ensure_output_dir()
+    progress = ProgressTracker(progress_callback)
+    change_detector = ChangeDetector(key, logger, fields=fields)
+    pacing = PacingController(logger, stop_event=stop_event)
+    snapshot_store = SnapshotStore(settings.SNAPSHOT_DIR, logger) if settings.SNAPSHOTS else None
+    retries = RetryQueue(key, logger) if settings.RETRY_FAILED else None
+
+    scrape = _scrape_with_cdp if settings.DRIVER_BACKEND == "cdp" else _scrape_with_selenium
+    info_scraper = scrape(keyword, key, skip_extraction, progress, stop_event,
+                          change_detector, pacing, snapshot_store, retries, fields)
+
+    # Rien à normaliser si l'annulation est intervenue avant la première fiche
+    input_path = f"out/product_details_live_{key}.json"
+    if not os.path.exists(input_path):
+        return
+
+    # Utilise le key pour la normalisation
+    progress.emit("normalizing")
+    normalizer = ProductNormalizer(
+        input_path= input_path,
+        output_path= f"out/product_details_live_{key}_cleaned.json",
+        logger=logger,
+        fields=fields,
+    )
+    normalized = normalizer.run()
+    # Un passage interrompu ne couvre pas toute la liste : pas de diff sur des fiches absentes
+    if info_scraper and info_scraper.run_finished:
+        change_detector.run(normalized, info_scraper.results,
+                            listed=[link["href"] for link in info_scraper.links])
+
+
+def _scrape_with_selenium(keyword, key, skip_extraction, progress, stop_event,
+                          change_detector, pacing, snapshot_store, retries, fields):
+    info_scraper = None
+    http_fetcher = HttpPlaceFetcher(logger) if settings.HTTP_FIRST else None
+    watchdog = DriverWatchdog(logger)
+    driver = watchdog.driver
 
     try:
         if not skip_extraction:
+            progress.emit("search")
             driver.get(settings.get_search_url(keyword))
 
-            scroll_mgr = ScrollManager(driver)
+            scroll_mgr = ScrollManager(driver, logger, progress=progress, stop_event=stop_event,
+                                       pacing=pacing, prune=settings.PRUNE_FEED)
             scroll_mgr.scroll_to_end()
+            if snapshot_store:
+                snapshot_store.save(driver.current_url, driver.page_source, "feed", key=key)
 
-            product_extractor = ProductExtractor(driver, filter_by_first_class=True)
-            product_extractor.run()
+            product_extractor = ProductExtractor(driver, logger, filter_by_first_class=True)
+            links = product_extractor.run(scroll_mgr.harvested_links() if settings.PRUNE_FEED else None)
+            progress.emit("links", found=len(links))
 
             # ➕ Le key est maintenant passé ici
-            info_scraper = ProductInfoScraper(driver, key)
-            info_scraper.scrape_info()
+            if not (stop_event and stop_event.is_set()):
+                info_scraper = ProductInfoScraper(
+                    driver, key, logger,
+                    change_detector=change_detector,
+                    progress=progress,
+                    stop_event=stop_event,
+                    pacing=pacing,
+                    http_fetcher=http_fetcher,
+                    tabs=settings.DETAIL_TABS,
+                    watchdog=watchdog,
+                    snapshot_store=snapshot_store,
+                    retry_queue=retries,
+                    fields=fields,
+                )
+                info_scraper.scrape_info()
 
     finally:
-        driver.quit()
+        progress.emit("closing")
+        watchdog.quit()
+        if http_fetcher:
+            http_fetcher.close()
+    return info_scraper
 
-    # Utilise le key pour la normalisation
-    normalizer = ProductNormalizer(
-        input_path= f"out/product_details_live_{key}.json",
-        output_path= f"out/product_details_live_{key}_cleaned.json",
-    )
-    normalizer.run()
 
+def _scrape_with_cdp(keyword, key, skip_extraction, progress, stop_event,
+                     change_detector, pacing, snapshot_store, retries, fields):
+    if skip_extraction:
+        return None
+    cdp_scraper = CDPScraper(key, logger, pacing=pacing, progress=progress, stop_event=stop_event,
+                             change_detector=change_detector, snapshot_store=snapshot_store,
+                             retry_queue=retries, fields=fields)
+    try:
+        # Ce thread n'a pas de boucle : une boucle dédiée le temps du job
+        asyncio.run(cdp_scraper.run(settings.get_search_url(keyword)))
+    finally:
+        progress.emit("closing")
+    return cdp_scraper.info_scraper
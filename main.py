@@ -1,28 +1,23 @@
-from fastapi import FastAPI, BackgroundTasks, Request
+from fastapi import FastAPI, BackgroundTasks, Request, HTTPException, Query
 from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
+from typing import List, Optional
 import asyncio
 import logging
+import os
 
-from scraper.driver_factory import DriverFactory
-from scraper.scroll_manager import ScrollManager
-from scraper.products import ProductExtractor
-from scraper.product_info_scraper import ProductInfoScraper
-from scraper.product_normalizer import ProductNormalizer
 from config import settings
 from config.logging_config import setup_logging
 
+# The scraper stack (selenium, webdriver_manager) and the blog models are
+# imported where they are first used, so that the API starts answering
+# without paying for them.
+
 # --- New Imports for Blog --- #
-from sqlalchemy.orm import Session
-import crud, models, schemas
-from database import SessionLocal, engine, get_db
 from posts_router import router as posts_router
 # --- End New Imports --- #
 
-# Create database tables
-models.Base.metadata.create_all(bind=engine)
-
 app = FastAPI()
 
 # --- Add Posts Router --- #
@@ -41,10 +36,20 @@ app.add_middleware(
     allow_headers=["*"],  # Allows all headers
 )
 
+# --- Create database tables --- #
+@app.on_event("startup")
+def create_tables():
+    import models
+    from database import engine
+    models.Base.metadata.create_all(bind=engine)
+# ------------------------------ #
+
 # --- Function to create initial post --- #
 @app.on_event("startup")
 def create_initial_post():
-    db: Session = SessionLocal()
+    import crud, schemas
+    from database import SessionLocal
+    db = SessionLocal()
     patinage_post = crud.get_post_by_slug(db, slug="patinage")
     if not patinage_post:
         # Ensure a default user exists
@@ -63,6 +68,14 @@ def create_initial_post():
 
 class ScrapeRequest(BaseModel):
     keyword: str
+    # Champs voulus (ex: ["phone", "rating"]) ; absent = tous. Le nom est toujours inclus.
+    fields: Optional[List[str]] = None
+
+# Pacing controller of the running (or last) scraping job, exposed on /metrics
+current_pacing = None
+
+# Spatial index per key, rebuilt when its cleaned results file changes
+spatial_indexes = {}
 
 async def log_streamer():
     # Continuously yield log messages from the stream handler
@@ -79,42 +92,150 @@ async def stream_logs(request: Request):
     return StreamingResponse(log_streamer(), media_type="text/event-stream")
 
 
-def lancer_scraping(keyword: str, skip_extraction: bool = False):
+def lancer_scraping(keyword: str, skip_extraction: bool = False, fields: Optional[List[str]] = None):
     """The main scraping function, integrated from gui_config."""
+    from scraper.driver_watchdog import DriverWatchdog
+    from scraper.scroll_manager import ScrollManager
+    from scraper.products import ProductExtractor
+    from scraper.product_info_scraper import ProductInfoScraper
+    from scraper.change_detector import ChangeDetector
+    from scraper.pacing import PacingController
+    from scraper.http_fetcher import HttpPlaceFetcher
+    from scraper.snapshot_store import SnapshotStore
+    from scraper.retry_queue import RetryQueue
+
+    global current_pacing
+    settings.ensure_output_dir()
     key = keyword.replace(' ', '_').lower()
     logger.info(f"Starting scraping process for keyword: '{keyword}' (key: '{key}')")
-    driver = DriverFactory.create()
+    change_detector = ChangeDetector(key, logger, fields=fields)
+    current_pacing = pacing = PacingController(logger)
+    info_scraper = None
+    http_fetcher = HttpPlaceFetcher(logger) if settings.HTTP_FIRST else None
+    snapshot_store = SnapshotStore(settings.SNAPSHOT_DIR, logger) if settings.SNAPSHOTS else None
+    retries = RetryQueue(key, logger) if settings.RETRY_FAILED else None
+    watchdog = DriverWatchdog(logger)
+    driver = watchdog.driver
     try:
         if not skip_extraction:
             logger.info(f"Navigating to search URL for key: '{key}'")
             driver.get(settings.get_search_url(key))
-            scroll_mgr = ScrollManager(driver, logger)
+            scroll_mgr = ScrollManager(driver, logger, pacing=pacing,
+                                       prune=settings.PRUNE_FEED)
             scroll_mgr.scroll_to_end()
+            if snapshot_store:
+                snapshot_store.save(driver.current_url, driver.page_source, "feed", key=key)
             product_extractor = ProductExtractor(driver, logger, filter_by_first_class=True)
-            product_extractor.run()
+            product_extractor.run(scroll_mgr.harvested_links() if settings.PRUNE_FEED else None)
         
-        info_scraper = ProductInfoScraper(driver, key, logger)
+        info_scraper = ProductInfoScraper(driver, key, logger, change_detector=change_detector,
+                                          pacing=pacing, http_fetcher=http_fetcher,
+                                          tabs=settings.DETAIL_TABS, watchdog=watchdog,
+                                          snapshot_store=snapshot_store, retry_queue=retries,
+                                          fields=fields)
         info_scraper.scrape_info()
     except Exception as e:
         logger.error(f"An error occurred during scraping: {e}", exc_info=True)
     finally:
         logger.info("Closing the browser driver.")
-        driver.quit()
+        watchdog.quit()
+        if http_fetcher:
+            http_fetcher.close()
+
+    finish_scraping(key, change_detector, info_scraper, fields)
+
+async def lancer_scraping_cdp(keyword: str, skip_extraction: bool = False, fields: Optional[List[str]] = None):
+    """lancer_scraping on the asyncio CDP backend, driven from the API's own event loop."""
+    from scraper.cdp_driver import CDPScraper
+    from scraper.change_detector import ChangeDetector
+    from scraper.pacing import PacingController
+    from scraper.snapshot_store import SnapshotStore
+    from scraper.retry_queue import RetryQueue
+
+    global current_pacing
+    settings.ensure_output_dir()
+    key = keyword.replace(' ', '_').lower()
+    logger.info(f"Starting CDP scraping process for keyword: '{keyword}' (key: '{key}')")
+    change_detector = ChangeDetector(key, logger, fields=fields)
+    current_pacing = pacing = PacingController(logger)
+    cdp_scraper = CDPScraper(
+        key, logger, pacing=pacing, change_detector=change_detector,
+        snapshot_store=SnapshotStore(settings.SNAPSHOT_DIR, logger) if settings.SNAPSHOTS else None,
+        retry_queue=RetryQueue(key, logger) if settings.RETRY_FAILED else None,
+        fields=fields,
+    )
+    try:
+        await cdp_scraper.run(None if skip_extraction else settings.get_search_url(key))
+    except Exception as e:
+        logger.error(f"An error occurred during scraping: {e}", exc_info=True)
+
+    await asyncio.to_thread(finish_scraping, key, change_detector, cdp_scraper.info_scraper, fields)
+
+def finish_scraping(key, change_detector, info_scraper, fields=None):
+    """Normalize the raw results of a job and record what changed since the last run."""
+    from scraper.product_normalizer import ProductNormalizer
 
     normalizer = ProductNormalizer(
         input_path=f"out/product_details_live_{key}.json",
         output_path=f"out/product_details_live_{key}_cleaned.json",
-        logger=logger
+        logger=logger,
+        fields=fields,
     )
-    normalizer.run()
+    normalized = normalizer.run()
+    # Un passage interrompu ne couvre pas toute la liste : pas de diff sur des fiches absentes
+    if info_scraper and info_scraper.run_finished:
+        change_detector.run(normalized, info_scraper.results,
+                            listed=[link["href"] for link in info_scraper.links])
+    else:
+        logger.info(f"Passage incomplet pour '{key}' : diff reporté au prochain passage complet.")
     logger.info(f"Scraping and normalization for '{key}' completed.")
 
 @app.post("/scrape")
 def scrape(request: ScrapeRequest, background_tasks: BackgroundTasks):
     """API endpoint to trigger the scraping process in the background."""
+    from scraper.product_info_scraper import ProductInfoScraper
+
+    try:
+        ProductInfoScraper.resolve_fields(request.fields)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
     # Clear previous logs before starting a new job
     stream_handler.records.clear()
-    background_tasks.add_task(lancer_scraping, request.keyword)
+    # Le backend CDP est asynchrone : il tourne sur la boucle de l'API, sans thread
+    job = lancer_scraping_cdp if settings.DRIVER_BACKEND == "cdp" else lancer_scraping
+    background_tasks.add_task(job, request.keyword, fields=request.fields)
     return {"message": "Scraping started successfully in the background."}
 
+@app.get("/metrics")
+def metrics():
+    """Current state of the adaptive pacing controller."""
+    return {"pacing": current_pacing.snapshot() if current_pacing else None}
+
+def get_spatial_index(key: str):
+    from scraper.spatial_index import SpatialIndex
+
+    key = key.replace(' ', '_').lower()
+    path = f"out/product_details_live_{key}_cleaned.json"
+    if not os.path.exists(path):
+        raise HTTPException(status_code=404, detail=f"No scraped places for '{key}'")
+    mtime = os.path.getmtime(path)
+    cached = spatial_indexes.get(key)
+    if cached is None or cached[0] != mtime:
+        cached = spatial_indexes[key] = (mtime, SpatialIndex.from_file(path, logger=logger))
+    return cached[1]
+
+@app.get("/places/{key}/within")
+def places_within(key: str, lat: float = Query(..., ge=-90, le=90), lng: float = Query(..., ge=-180, le=180),
+                  radius_km: float = Query(5, gt=0), limit: int = Query(100, gt=0)):
+    """Places of a scraped key within `radius_km` of (lat, lng), nearest first."""
+    places = get_spatial_index(key).within(lat, lng, radius_km, limit)
+    return {"count": len(places), "places": places}
+
+@app.get("/places/{key}/nearest")
+def places_nearest(key: str, lat: float = Query(..., ge=-90, le=90), lng: float = Query(..., ge=-180, le=180),
+                   k: int = Query(10, gt=0, le=1000), max_radius_km: float = Query(None, gt=0)):
+    """The `k` places of a scraped key nearest to (lat, lng)."""
+    places = get_spatial_index(key).nearest(lat, lng, k, max_radius_km)
+    return {"count": len(places), "places": places}
+
 # To run this app, use the command: uvicorn main:app --reload
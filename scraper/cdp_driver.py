@@ -0,0 +1,456 @@
+"""Asyncio backend talking to Chrome's DevTools protocol (settings.DRIVER_BACKEND = "cdp").
+
+One Chrome is driven over a single websocket: every page is a flattened
+target session on it, so many pages load concurrently from one event loop,
+without chromedriver and without threads. CDPPage only offers the few calls
+the pipeline needs (get, wait_for, click, content, current_url, title). Once
+a page is rendered, its HTML goes through OfflineDriver to the unchanged
+ProductExtractor / ProductInfoScraper code, as `scraper.reextract` does with
+stored snapshots. That parsing and extraction is CPU-bound and writes the
+output files, so it runs on one dedicated thread, off the event loop.
+"""
+import asyncio
+import itertools
+import json
+import logging
+import os
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+from selenium.common.exceptions import TimeoutException, WebDriverException
+
+from config import settings
+from scraper.offline_dom import OfflineDriver
+from scraper.pacing import PacingController
+from scraper.product_info_scraper import ProductInfoScraper
+from scraper.products import ProductExtractor
+from scraper.retry_queue import THROTTLING, classify
+from scraper.scroll_manager import ScrollManager
+
+try:
+    import websockets
+except ImportError:  # le backend CDP est alors indisponible
+    websockets = None
+
+CHROME_CANDIDATES = ("google-chrome", "google-chrome-stable", "chromium", "chromium-browser", "chrome")
+
+DETAILS_BUTTON_SELECTOR = 'button[aria-label^="Informations sur"]'
+
+
+class CDPError(WebDriverException):
+    """Error answered by Chrome to a CDP command, or raised by evaluated JavaScript."""
+
+
+def find_chrome():
+    if settings.CHROME_BINARY:
+        return settings.CHROME_BINARY
+    for name in CHROME_CANDIDATES:
+        path = shutil.which(name)
+        if path:
+            return path
+    raise WebDriverException("Chrome introuvable : renseigner settings.CHROME_BINARY")
+
+
+class CDPBrowser:
+    """A Chrome process and the websocket all of its pages are multiplexed on."""
+
+    def __init__(self, logger: logging.Logger):
+        self.logger = logger
+        self._process = None
+        self._profile = None
+        self._ws = None
+        self._reader = None
+        self._ids = itertools.count(1)
+        self._pending = {}  # id de commande -> Future de la réponse
+        self._waiters = {}  # (session, événement) -> Futures en attente
+
+    # ---------- lifecycle -----------------------------------------------
+    async def start(self):
+        if websockets is None:
+            raise ImportError("Le backend CDP nécessite le paquet 'websockets'.")
+        self._profile = tempfile.mkdtemp(prefix="insea-cdp-")
+        args = [
+            find_chrome(),
+            "--remote-debugging-port=0",
+            f"--user-data-dir={self._profile}",
+            "--no-first-run",
+            "--no-default-browser-check",
+            f"--window-size={settings.WINDOW_SIZE[0]},{settings.WINDOW_SIZE[1]}",
+            # Les pages en arrière-plan doivent continuer à charger
+            "--disable-background-timer-throttling",
+            "--disable-backgrounding-occluded-windows",
+            "--disable-renderer-backgrounding",
+        ]
+        if settings.HEADLESS:
+            args.append("--headless=new")
+        self._process = await asyncio.create_subprocess_exec(
+            *args, stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.DEVNULL
+        )
+        await self.connect(await self._endpoint())
+        return self
+
+    async def _endpoint(self):
+        # Chrome écrit son port puis le chemin du websocket navigateur dans le profil
+        port_file = os.path.join(self._profile, "DevToolsActivePort")
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.PAGE_LOAD_TIMEOUT_SEC
+        while True:
+            if os.path.exists(port_file):
+                with open(port_file, encoding="utf-8") as f:
+                    lines = f.read().split()
+                if len(lines) >= 2:
+                    return f"ws://127.0.0.1:{lines[0]}{lines[1]}"
+            if self._process.returncode is not None:
+                raise WebDriverException(f"Chrome s'est arrêté au démarrage (code {self._process.returncode})")
+            if loop.time() > deadline:
+                raise TimeoutException("Chrome n'a pas ouvert de port DevTools")
+            await asyncio.sleep(0.1)
+
+    async def connect(self, url):
+        self._ws = await websockets.connect(url, max_size=None)
+        self._reader = asyncio.create_task(self._read())
+
+    async def close(self):
+        if self._ws is not None:
+            try:
+                await self.send("Browser.close", timeout=5)
+            except WebDriverException:
+                pass  # la connexion tombe souvent avant la réponse
+            await self._ws.close()
+        if self._reader is not None:
+            await self._reader
+        if self._process is not None and self._process.returncode is None:
+            self._process.kill()
+            await self._process.wait()
+        if self._profile:
+            shutil.rmtree(self._profile, ignore_errors=True)
+
+    # ---------- protocol ------------------------------------------------
+    async def _read(self):
+        try:
+            async for raw in self._ws:
+                message = json.loads(raw)
+                if "id" in message:
+                    future = self._pending.pop(message["id"], None)
+                    if future is None or future.done():
+                        continue
+                    if "error" in message:
+                        future.set_exception(CDPError(message["error"].get("message", "")))
+                    else:
+                        future.set_result(message.get("result", {}))
+                else:
+                    key = (message.get("sessionId"), message.get("method"))
+                    for future in self._waiters.pop(key, []):
+                        if not future.done():
+                            future.set_result(message.get("params", {}))
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            closed = WebDriverException("Connexion CDP fermée")
+            waiting = list(self._pending.values()) + [f for fs in self._waiters.values() for f in fs]
+            for future in waiting:
+                if not future.done():
+                    future.set_exception(closed)
+            self._pending.clear()
+            self._waiters.clear()
+
+    async def send(self, method, params=None, session_id=None, timeout=None):
+        if self._reader is None or self._reader.done():
+            raise WebDriverException("Connexion CDP fermée")
+        message_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[message_id] = future
+        message = {"id": message_id, "method": method, "params": params or {}}
+        if session_id:
+            message["sessionId"] = session_id
+        try:
+            await self._ws.send(json.dumps(message))
+        except websockets.ConnectionClosed:
+            self._pending.pop(message_id, None)
+            raise WebDriverException("Connexion CDP fermée")
+        try:
+            return await asyncio.wait_for(future, timeout or settings.PAGE_LOAD_TIMEOUT_SEC)
+        except asyncio.TimeoutError:
+            self._pending.pop(message_id, None)
+            raise TimeoutException(f"Pas de réponse CDP à {method}")
+
+    def expect(self, session_id, method):
+        """Future of the next `method` event of a session; create it before the command."""
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault((session_id, method), []).append(future)
+        return future
+
+    async def new_page(self):
+        target = await self.send("Target.createTarget", {"url": "about:blank"})
+        attached = await self.send("Target.attachToTarget", {"targetId": target["targetId"], "flatten": True})
+        page = CDPPage(self, target["targetId"], attached["sessionId"])
+        await page.send("Page.enable")
+        return page
+
+
+class CDPPage:
+    """One tab of a CDPBrowser; `current_url` and `title` follow the last navigation."""
+
+    def __init__(self, browser, target_id, session_id):
+        self.browser = browser
+        self.target_id = target_id
+        self.session_id = session_id
+        self.current_url = "about:blank"
+        self.title = ""
+
+    async def send(self, method, params=None, timeout=None):
+        return await self.browser.send(method, params, self.session_id, timeout)
+
+    async def get(self, url, timeout=None):
+        timeout = timeout or settings.PAGE_LOAD_TIMEOUT_SEC
+        loaded = self.browser.expect(self.session_id, "Page.domContentEventFired")
+        result = await self.send("Page.navigate", {"url": url}, timeout)
+        if result.get("errorText"):
+            loaded.cancel()
+            raise WebDriverException(f"{result['errorText']} : {url}")
+        try:
+            await asyncio.wait_for(loaded, timeout)
+        except asyncio.TimeoutError:
+            raise TimeoutException(f"Chargement trop long : {url}")
+        self.current_url, self.title = await self.evaluate("[location.href, document.title]")
+
+    async def evaluate(self, expression, timeout=None):
+        result = await self.send("Runtime.evaluate", {
+            "expression": expression, "returnByValue": True, "awaitPromise": True,
+        }, timeout)
+        if "exceptionDetails" in result:
+            details = result["exceptionDetails"]
+            raise CDPError(details.get("exception", {}).get("description") or details.get("text", ""))
+        return result["result"].get("value")
+
+    async def wait_until(self, condition, timeout, poll=0.1):
+        """Wait until the JavaScript expression `condition` is truthy."""
+        deadline = asyncio.get_running_loop().time() + timeout
+        while not await self.evaluate(condition):
+            if asyncio.get_running_loop().time() >= deadline:
+                raise TimeoutException(f"Condition non remplie : {condition}")
+            await asyncio.sleep(poll)
+
+    async def wait_for(self, selector, timeout):
+        await self.wait_until(f"!!document.querySelector({json.dumps(selector)})", timeout)
+
+    async def click(self, selector):
+        await self.evaluate(f"document.querySelector({json.dumps(selector)}).click()")
+
+    async def content(self):
+        return await self.evaluate("document.documentElement.outerHTML")
+
+    async def close(self):
+        try:
+            await self.browser.send("Target.closeTarget", {"targetId": self.target_id}, timeout=5)
+        except WebDriverException:
+            pass
+
+
+class BlockingPage:
+    """Selenium-style, blocking view of a CDPPage for code running off the event loop.
+
+    `execute_script` takes a function body reading `arguments`, as Selenium
+    does, so ScrollManager drives a CDP page exactly like a WebDriver; the
+    arguments must be JSON values.
+    """
+
+    def __init__(self, page, loop):
+        self.page = page
+        self.loop = loop
+
+    @property
+    def current_url(self):
+        return self.page.current_url
+
+    def execute_script(self, script, *args):
+        expression = "(function () {%s}).apply(null, %s)" % (script, json.dumps(args))
+        return asyncio.run_coroutine_threadsafe(self.page.evaluate(expression), self.loop).result()
+
+
+class CDPScraper:
+    """Search and detail phases of a job on the CDP backend.
+
+    `pages` tabs work through the links concurrently; as with Selenium tabs,
+    the pacing controller's worker count caps how many of them are active.
+    Extraction, saving, completeness flags and retries are ProductInfoScraper's.
+    """
+
+    def __init__(self, key, logger: logging.Logger, pages=None, pacing=None, progress=None,
+                 stop_event=None, change_detector=None, snapshot_store=None, retry_queue=None,
+                 fields=None):
+        self.key = key
+        self.logger = logger
+        self.pages = pages or settings.CDP_PAGES
+        self.pacing = pacing or PacingController(logger)
+        self.progress = progress
+        self.stop_event = stop_event
+        self.change_detector = change_detector
+        self.snapshot_store = snapshot_store
+        self.retry_queue = retry_queue
+        self.fields = fields
+        self.browser = CDPBrowser(logger)
+        self.links = None
+        self.info_scraper = None
+        # Un seul thread : l'état de info_scraper (driver, résultats, fichiers) n'est pas partagé
+        self._extractor = None
+
+    def _stopped(self):
+        return bool(self.stop_event and self.stop_event.is_set())
+
+    async def _sleep(self, seconds):
+        """asyncio.sleep that ends early once `stop_event` is set."""
+        deadline = asyncio.get_running_loop().time() + seconds
+        while not self._stopped():
+            remaining = deadline - asyncio.get_running_loop().time()
+            if remaining <= 0:
+                return
+            await asyncio.sleep(min(remaining, 0.5))
+
+    async def run(self, search_url=None):
+        """Collect the links of `search_url` (or reuse the latest ones), then scrape every place."""
+        try:
+            await self.browser.start()
+            if search_url:
+                await self.collect_links(search_url)
+            if not self._stopped():
+                await self.scrape_places()
+        finally:
+            await self.browser.close()
+        return self.info_scraper
+
+    # ---------- recherche -----------------------------------------------
+    async def collect_links(self, search_url):
+        if self.progress:
+            self.progress.emit("search")
+        page = await self.browser.new_page()
+        try:
+            await page.get(search_url)
+            # Même boucle de défilement que Selenium, dans un thread qui pilote la page
+            scroll_mgr = ScrollManager(BlockingPage(page, asyncio.get_running_loop()), self.logger,
+                                       progress=self.progress, stop_event=self.stop_event,
+                                       pacing=self.pacing, prune=settings.PRUNE_FEED, collect=True)
+            await asyncio.get_running_loop().run_in_executor(None, scroll_mgr.scroll_to_end)
+            if self.snapshot_store:
+                self.snapshot_store.save(page.current_url, await page.content(), "feed", key=self.key)
+        finally:
+            await page.close()
+
+        self.links = ProductExtractor(None, self.logger, filter_by_first_class=True).run(scroll_mgr.harvested_links())
+        if self.progress:
+            self.progress.emit("links", found=len(self.links))
+
+    # ---------- fiches --------------------------------------------------
+    async def _offload(self, fn, *args):
+        """Run `fn` on the extraction thread, where all info_scraper state is touched."""
+        return await asyncio.get_running_loop().run_in_executor(self._extractor, fn, *args)
+
+    async def scrape_places(self):
+        scraper = self.info_scraper = ProductInfoScraper(
+            None, self.key, self.logger, change_detector=self.change_detector,
+            pacing=PacingController.offline(self.logger), snapshot_store=self.snapshot_store,
+            links=self.links, retry_queue=self.retry_queue, fields=self.fields,
+        )
+        # Le DOM reçu est déjà rendu : l'extraction n'a rien à attendre
+        scraper.poll_frequency = 0.001
+        # Toutes les pages travaillent dès le départ ; l'AIMD en retire si Maps ralentit
+        self.pacing.max_workers = max(self.pacing.max_workers, self.pages)
+        self.pacing.workers = max(self.pacing.workers, self.pages)
+        scraper.start_run()
+        if self.progress:
+            self.progress.start_places(len(scraper.links))
+
+        queue = asyncio.Queue()
+        for index, link in enumerate(scraper.links, start=1):
+            queue.put_nowait((index, link))
+        self._extractor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="cdp-extract")
+        try:
+            await asyncio.gather(*(self._worker(slot, queue) for slot in range(self.pages)))
+        finally:
+            self._extractor.shutdown(wait=True)
+
+        if self._stopped():
+            self.logger.info(f" Annulation demandée : {queue.qsize()} liens non traités.")
+            return
+        scraper.finish_run()
+        if self.retry_queue is not None and len(self.retry_queue):
+            self.logger.info(f" {len(self.retry_queue)} réessai(s) en attente "
+                             f"(python -m scraper.worker retry {self.key}).")
+
+    async def _worker(self, slot, queue):
+        page = await self.browser.new_page()
+        try:
+            while not queue.empty() and not self._stopped():
+                if slot >= self.pacing.workers:
+                    await self._sleep(max(self.pacing.delay, 0.5))
+                    continue
+                index, link = queue.get_nowait()
+                job = await self._offload(self.info_scraper._prepare, index, link)
+                if job is not None:
+                    await self._sleep(self.pacing.delay)
+                    if not await self._scrape(page, *job):
+                        # Onglet planté ou détaché : on en ouvre un neuf
+                        await page.close()
+                        page = await self.browser.new_page()
+                if self.progress:
+                    self.progress.place_done(name=link["name"], pacing=self.pacing.snapshot())
+        finally:
+            await page.close()
+
+    async def _scrape(self, page, data, sections):
+        """Render one place, then extract and save it; False if the tab is no longer usable."""
+        loop = asyncio.get_running_loop()
+        href = data["url"]
+        started = loop.time()
+        try:
+            await page.get(href)
+            if self.pacing.is_blocked(page):
+                self.pacing.record(loop.time() - started, PacingController.THROTTLED)
+                self.logger.error(f" Erreur scraping {href} : page de blocage")
+                await self._offload(self.info_scraper._schedule_retry, data, sections, THROTTLING,
+                                    "page de blocage")
+                self.logger.warning(f"Page de blocage détectée, pause de {self.pacing.THROTTLE_COOLDOWN_SEC}s.")
+                await self._sleep(self.pacing.THROTTLE_COOLDOWN_SEC)
+                return True
+
+            ready = ProductInfoScraper.CONTACT_SELECTOR if "contacts" in sections else "h1"
+            await page.wait_for(ready, self.pacing.wait("page"))
+            latency = loop.time() - started
+            pages = {"place": await page.content()}
+            if "details" in sections:
+                pages.update(await self._open_details(page))
+        except TimeoutException as e:
+            self.pacing.record(loop.time() - started, PacingController.TIMEOUT)
+            self.logger.error(f" Erreur scraping {href} : timeout {e}")
+            await self._offload(self.info_scraper._schedule_retry, data, sections, classify(e), e)
+            return True
+        except WebDriverException as e:
+            self.pacing.record(None, PacingController.ERROR)
+            self.logger.error(f" Erreur scraping {href} : {e}")
+            await self._offload(self.info_scraper._schedule_retry, data, sections, classify(e), e)
+            return False
+
+        await self._offload(self._extract, page.current_url, pages, data, sections, started)
+        self.pacing.record(latency, PacingController.OK)
+        return True
+
+    def _extract(self, url, pages, data, sections, started):
+        """Parse the rendered pages and extract/save the place (extraction thread)."""
+        self.info_scraper._driver = OfflineDriver(url, pages)
+        self.info_scraper._collect(data, sections, started)
+
+    async def _open_details(self, page):
+        """HTML of the "Informations sur" panel, or {} when the place has none."""
+        try:
+            await page.wait_for(DETAILS_BUTTON_SELECTOR, self.pacing.wait("details"))
+        except TimeoutException:
+            return {}
+        count_js = "document.querySelectorAll('.fontBodyMedium').length"
+        before = await page.evaluate(count_js)
+        await page.click(DETAILS_BUTTON_SELECTOR)
+        try:
+            await page.wait_until(f"{count_js} !== {before}", self.pacing.wait("details"))
+        except TimeoutException:
+            pass  # panneau identique : on garde ce qui est affiché
+        return {"place_details": await page.content()}
@@ -0,0 +1,152 @@
+import hashlib
+import json
+import os
+import re
+import logging
+from datetime import datetime
+
+
+class ChangeDetector:
+    """Keeps a per-key snapshot of place records and emits added/removed/changed diffs."""
+
+    # Champs qui ne décrivent pas le contenu de la fiche
+    VOLATILE_KEYS = ("url", "fingerprint", "lat", "lng")
+    # Note et nombre d'avis affichés dans la carte du feed, ex. "4,5(1 234)"
+    CARD_RATING_RE = re.compile(r"(\d[.,]\d)\s*\(([\d\s\u202f.,]+)\)")
+
+    def __init__(self, key, logger: logging.Logger = None, output_folder="out", fields=None):
+        self.key = key
+        self.logger = logger
+        # Projection : seuls ces champs (et le nom) sont comparés d'un passage à l'autre
+        self.fields = set(fields) | {"name"} if fields else None
+        self.output_folder = output_folder
+        self.snapshot_path = os.path.join(output_folder, f"snapshot_{key}.json")
+        self.snapshot = self._load_snapshot()
+
+    # ---------- hashing -------------------------------------------------
+    @classmethod
+    def listing_fingerprint(cls, name: str, card_text: str = "") -> str:
+        """Fingerprint of a result-list entry, as seen before opening the place page.
+
+        Covers the name and the rating/review count shown on the card; the rest
+        of the card text (opening hours, "open now") changes from one crawl to
+        the next without the place itself changing.
+        """
+        rating = ""
+        match = cls.CARD_RATING_RE.search(card_text or "")
+        if match:
+            count = re.sub(r"\D", "", match.group(2))
+            rating = f"{match.group(1).replace('.', ',')}\x1f{count}"
+        raw = f"{(name or '').strip()}\x1f{rating}"
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    @classmethod
+    def content_hash(cls, record: dict, fields=None) -> str:
+        content = {k: v for k, v in record.items()
+                   if k not in cls.VOLATILE_KEYS and (fields is None or k in fields)}
+        raw = json.dumps(content, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    # ---------- snapshot ------------------------------------------------
+    def _load_snapshot(self):
+        if not os.path.exists(self.snapshot_path):
+            return {}
+        with open(self.snapshot_path, "r", encoding="utf-8") as f:
+            try:
+                return json.load(f)
+            except json.JSONDecodeError:
+                if self.logger:
+                    self.logger.warning(f"Snapshot corrompu ignoré : {self.snapshot_path}")
+                return {}
+
+    def _save_snapshot(self):
+        os.makedirs(self.output_folder, exist_ok=True)
+        tmp_path = self.snapshot_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.snapshot, f, ensure_ascii=False)
+        os.replace(tmp_path, self.snapshot_path)
+
+    def cached_record(self, href: str, fingerprint: str):
+        """Return the last detail record for `href` if its listing has not changed."""
+        entry = self.snapshot.get(href)
+        if entry and fingerprint and entry.get("fingerprint") == fingerprint:
+            return entry.get("raw")
+        return None
+
+    # ---------- diff ----------------------------------------------------
+    def diff(self, records, listed=None):
+        """Yield diff events of `records` (normalized, keyed by url) against the snapshot.
+
+        With `listed` (the urls of this crawl's result list), a place only counts
+        as removed when it left the list, not when its page failed to scrape.
+        """
+        seen = set()
+        for record in records:
+            url = record.get("url")
+            if not url:
+                continue
+            seen.add(url)
+            previous = self.snapshot.get(url)
+            digest = self.content_hash(record)
+            if previous is None:
+                yield {"op": "added", "url": url, "record": record}
+            elif self._changed(previous, record, digest):
+                yield {"op": "changed", "url": url, "record": record, "previous": previous["record"]}
+
+        for url, previous in self.snapshot.items():
+            if url not in seen and (listed is None or url not in listed):
+                yield {"op": "removed", "url": url, "previous": previous["record"]}
+
+    def _changed(self, previous, record, digest):
+        if self.fields is None:
+            return previous["hash"] != digest
+        return self.content_hash(previous["record"], self.fields) != self.content_hash(record, self.fields)
+
+    def run(self, records, raw_records=(), listed=None):
+        """Write the diff stream for this run and roll the snapshot forward.
+
+        `records` are the normalized places of this crawl only; `raw_records`
+        are the scraper's records, kept in the snapshot so unchanged places can
+        skip their detail page on the next crawl. Listed places missing from
+        `records` keep their previous snapshot entry.
+        """
+        listed = set(listed) if listed is not None else None
+        raw_by_url = {r["url"]: r for r in raw_records if r.get("url")}
+        events = list(self.diff(records, listed))
+
+        timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+        diff_path = os.path.join(self.output_folder, f"diff_{self.key}_{timestamp}.jsonl")
+        os.makedirs(self.output_folder, exist_ok=True)
+        with open(diff_path, "w", encoding="utf-8") as f:
+            for event in events:
+                f.write(json.dumps(event, ensure_ascii=False) + "\n")
+
+        snapshot = {}
+        for record in records:
+            url = record.get("url")
+            if not url:
+                continue
+            raw = raw_by_url.get(url, {})
+            if self.fields is not None and url in self.snapshot:
+                # Les champs hors projection restent ceux du dernier passage complet
+                record = {**self.snapshot[url]["record"], **record}
+                raw = {**self.snapshot[url].get("raw", {}), **raw}
+            snapshot[url] = {
+                "hash": self.content_hash(record),
+                "fingerprint": raw.get("fingerprint", ""),
+                "record": record,
+                "raw": raw,
+            }
+        for url, previous in self.snapshot.items():
+            if listed is not None and url in listed and url not in snapshot:
+                snapshot[url] = previous
+        self.snapshot = snapshot
+        self._save_snapshot()
+
+        if self.logger:
+            counts = {op: sum(1 for e in events if e["op"] == op) for op in ("added", "removed", "changed")}
+            self.logger.info(
+                f"Diff '{self.key}': {counts['added']} ajoutés, {counts['removed']} supprimés, "
+                f"{counts['changed']} modifiés → {diff_path}"
+            )
+        return events
@@ -10,6 +10,10 @@ class DriverFactory:
         options.add_argument("--start-maximized")
         if settings.HEADLESS:
             options.add_argument("--headless=new")
+        # Les onglets en arrière-plan doivent continuer à charger (mode multi-onglets)
+        options.add_argument("--disable-background-timer-throttling")
+        options.add_argument("--disable-backgrounding-occluded-windows")
+        options.add_argument("--disable-renderer-backgrounding")
         options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
         driver = webdriver.Chrome(
             service=Service(ChromeDriverManager().install()),
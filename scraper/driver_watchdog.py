@@ -0,0 +1,129 @@
+import logging
+
+from config import settings
+from scraper.driver_factory import DriverFactory
+
+try:
+    import psutil
+except ImportError:  # la surveillance mémoire est alors désactivée
+    psutil = None
+
+
+class DriverWatchdog:
+    """Owns the Chrome driver and replaces it when it gets old, fat, hung or dead.
+
+    The browser is recycled after `max_pages` pages or once the RSS of its
+    process tree passes `max_rss_mb`. Page loads get a hard timeout, and a
+    session that stops answering after a failure is restarted. Callers always
+    go through `watchdog.driver`, so they pick up the new session.
+    """
+
+    def __init__(self, logger: logging.Logger, factory=DriverFactory.create,
+                 max_pages=None, max_rss_mb=None, page_timeout=None):
+        self.logger = logger
+        self.factory = factory
+        self.max_pages = max_pages or settings.WATCHDOG_MAX_PAGES
+        self.max_rss_mb = max_rss_mb or settings.WATCHDOG_MAX_RSS_MB
+        self.page_timeout = page_timeout or settings.PAGE_LOAD_TIMEOUT_SEC
+        self.driver = None
+        self.pages = 0
+        self.recycles = 0
+        self._suspect = False
+        if psutil is None:
+            self.logger.warning("psutil absent : recyclage sur seuil mémoire désactivé.")
+        self.start()
+
+    # ---------- lifecycle -----------------------------------------------
+    def start(self):
+        self.driver = self.factory()
+        self.driver.set_page_load_timeout(self.page_timeout)
+        self.driver.set_script_timeout(self.page_timeout)
+        self.pages = 0
+        self._suspect = False
+
+    def quit(self):
+        if self.driver is None:
+            return
+        pids = self._process_tree()
+        try:
+            self.driver.quit()
+        except Exception as e:
+            self.logger.warning(f"driver.quit() a échoué ({e}), arrêt forcé de Chrome.")
+        # Un Chrome bloqué peut survivre à quit() : on nettoie les orphelins
+        for proc in pids:
+            try:
+                if proc.is_running():
+                    proc.kill()
+            except psutil.Error:
+                pass
+        self.driver = None
+
+    def recycle(self, reason):
+        rss = self.rss_mb()
+        rss_text = f"{rss:.0f} MB" if rss is not None else "n/a"
+        self.recycles += 1
+        self.logger.info(
+            f"Recyclage du navigateur #{self.recycles} ({reason}) après {self.pages} pages, RSS={rss_text}"
+        )
+        self.quit()
+        self.start()
+
+    # ---------- checks --------------------------------------------------
+    def page_done(self):
+        self.pages += 1
+
+    def report_failure(self, error):
+        """Called after a failed page; the session is probed before the next one."""
+        self._suspect = True
+        self.logger.debug(f"Watchdog: échec signalé ({type(error).__name__}).")
+
+    def is_alive(self):
+        try:
+            self.driver.execute_script("return 1")
+            return True
+        except Exception:  # un driver injoignable lève aussi des erreurs urllib3
+            return False
+
+    def recycle_reason(self):
+        if self._suspect:
+            self._suspect = False
+            if not self.is_alive():
+                return "session morte ou bloquée"
+        if self.pages >= self.max_pages:
+            return f"{self.max_pages} pages"
+        if self.pages and self.pages % settings.WATCHDOG_RSS_CHECK_EVERY == 0:
+            rss = self.rss_mb()
+            if rss is not None:
+                self.logger.debug(f"RSS navigateur : {rss:.0f} MB")
+                if rss > self.max_rss_mb:
+                    return f"RSS > {self.max_rss_mb} MB"
+        return None
+
+    def maybe_recycle(self):
+        """Recycle the browser if needed; returns True when a new session was started."""
+        reason = self.recycle_reason()
+        if reason:
+            self.recycle(reason)
+            return True
+        return False
+
+    # ---------- memory --------------------------------------------------
+    def _process_tree(self):
+        if psutil is None or self.driver is None:
+            return []
+        try:
+            root = psutil.Process(self.driver.service.process.pid)
+            return [root] + root.children(recursive=True)
+        except (psutil.Error, AttributeError):
+            return []
+
+    def rss_mb(self):
+        if psutil is None:
+            return None
+        total = 0
+        for proc in self._process_tree():
+            try:
+                total += proc.memory_info().rss
+            except psutil.Error:
+                continue
+        return total / 2**20
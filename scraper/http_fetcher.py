@@ -0,0 +1,137 @@
+import json
+import re
+import logging
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from config import settings
+from scraper.product_normalizer import ProductNormalizer
+
+
+STATE_RE = re.compile(r"window\.APP_INITIALIZATION_STATE\s*=\s*(\[.*?\]);window\.APP_", re.S)
+XSSI_PREFIX = ")]}'"
+
+
+def _get(data, *path):
+    """Nested list lookup that returns None instead of raising on short/absent nodes."""
+    for i in path:
+        if not isinstance(data, list) or i >= len(data) or data[i] is None:
+            return None
+        data = data[i]
+    return data
+
+
+def _find_place(node):
+    """Return the place array embedded (as an XSSI-prefixed JSON string) in the page state."""
+    if isinstance(node, str):
+        if node.startswith(XSSI_PREFIX):
+            try:
+                payload = json.loads(node[len(XSSI_PREFIX):])
+            except json.JSONDecodeError:
+                return None
+            place = _get(payload, 6)
+            if isinstance(place, list) and isinstance(_get(place, 11), str):
+                return place
+        return None
+    if isinstance(node, list):
+        for child in node:
+            place = _find_place(child)
+            if place is not None:
+                return place
+    return None
+
+
+def parse_place_html(html: str):
+    """Extract contacts and rating from a place page's initial HTML.
+
+    Returns None when the embedded page state cannot be found. Otherwise
+    only the fields actually found are present: a missing one may just sit
+    elsewhere in the state, so it is left for Selenium to settle.
+    """
+    match = STATE_RE.search(html)
+    if not match:
+        return None
+    try:
+        state = json.loads(match.group(1))
+    except json.JSONDecodeError:
+        return None
+
+    place = _find_place(state)
+    if place is None:
+        return None
+
+    address = _get(place, 39)
+    if not isinstance(address, str):
+        parts = _get(place, 2)
+        address = ", ".join(p for p in parts if isinstance(p, str)) if isinstance(parts, list) else ""
+
+    rating = _get(place, 4, 7)
+    count = _get(place, 4, 8)
+    website = _get(place, 7, 0)
+    phone = _get(place, 178, 0, 0)
+
+    fields = {}
+    if address:
+        fields["address"] = address
+    if isinstance(phone, str) and phone:
+        fields["phone"] = phone
+    if isinstance(website, str) and website:
+        fields["authority"] = website
+    # Même format que le texte affiché par Maps : virgule décimale, "(1234)"
+    if isinstance(rating, (int, float)):
+        fields["rating"] = str(rating).replace(".", ",")
+    if isinstance(count, int):
+        fields["number_of_rates"] = ProductNormalizer.rates_count(count)
+    return fields
+
+
+class HttpPlaceFetcher:
+    """Fetches place pages over a pooled HTTP session and parses their embedded state."""
+
+    FIELDS = ("address", "phone", "authority", "rating", "number_of_rates")
+
+    def __init__(self, logger: logging.Logger = None, timeout=None, pool_size=None):
+        self.logger = logger
+        self.timeout = timeout or settings.HTTP_TIMEOUT_SEC
+        pool_size = pool_size or settings.HTTP_POOL_SIZE
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=1)
+        self.session.mount("https://", adapter)
+        self.session.headers.update(settings.HTTP_HEADERS)
+        self.stats = {"pages": 0, "parsed": 0, "fields": {f: 0 for f in self.FIELDS}}
+
+    def fetch(self, href):
+        """Return the parsed fields for `href`, or None if Selenium has to do everything."""
+        self.stats["pages"] += 1
+        try:
+            response = self.session.get(href, timeout=self.timeout)
+            response.raise_for_status()
+        except requests.RequestException as e:
+            if self.logger:
+                self.logger.debug(f"HTTP échec pour {href} : {e}")
+            return None
+
+        fields = parse_place_html(response.text)
+        if fields is None:
+            return None
+
+        self.stats["parsed"] += 1
+        for name in fields:
+            self.stats["fields"][name] += 1
+        return fields
+
+    def hit_rates(self):
+        pages = self.stats["pages"] or 1
+        rates = {"parsed": self.stats["parsed"] / pages}
+        rates.update({name: hits / pages for name, hits in self.stats["fields"].items()})
+        return rates
+
+    def report(self):
+        if not self.logger or not self.stats["pages"]:
+            return
+        rates = ", ".join(f"{name}={rate:.0%}" for name, rate in self.hit_rates().items())
+        self.logger.info(f"HTTP-first sur {self.stats['pages']} pages : {rates}")
+
+    def close(self):
+        self.session.close()
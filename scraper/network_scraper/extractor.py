@@ -5,7 +5,7 @@ from config import settings
 class Extractor:
     @staticmethod
     def save_requests(requests: list[str], filename: str = "matching_urls.json"):
-        out_file = settings.OUTPUT_DIR / filename
+        out_file = settings.ensure_output_dir() / filename
         with open(out_file, "w", encoding="utf-8") as fh:
             json.dump(requests, fh, ensure_ascii=False, indent=2)
         print(f"Saved {len(requests)} URLs → {out_file}")
@@ -0,0 +1,222 @@
+"""A minimal, browser-free stand-in for a Selenium driver over stored HTML.
+
+It implements only what the scraper classes use (find_element(s) by CSS
+selector, class name, tag name and XPath "..", get_attribute, text, click),
+so ProductInfoScraper and ProductExtractor can re-run unchanged on
+snapshots from SnapshotStore.
+"""
+import re
+from html.parser import HTMLParser
+
+from selenium.webdriver.common.by import By
+from selenium.common.exceptions import (
+    NoSuchElementException, ElementClickInterceptedException, JavascriptException,
+)
+
+
+VOID_TAGS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input",
+    "link", "meta", "param", "source", "track", "wbr",
+}
+HIDDEN_TAGS = {"script", "style", "noscript", "template", "head"}
+BLOCK_TAGS = {"div", "p", "li", "ul", "ol", "h1", "h2", "h3", "h4", "section", "tr", "br", "button"}
+
+# tag, .classes et [attr op "value"] d'un sélecteur simple (sans combinateurs)
+SIMPLE_RE = re.compile(r"^(?P<tag>[a-zA-Z][\w-]*|\*)?(?P<rest>(?:\.[\w-]+|\[[^\]]+\])*)$")
+PART_RE = re.compile(r"\.([\w-]+)|\[\s*([\w-]+)\s*(?:([\^$*~]?=)\s*[\"']?([^\"'\]]*)[\"']?)?\s*\]")
+
+
+class OfflineScriptError(JavascriptException):
+    """JavaScript was asked of a stored page, which cannot run any."""
+
+
+class Element:
+    def __init__(self, tag, attrs, parent, driver):
+        self.tag_name = tag
+        self.attrs = attrs
+        self.parent = parent
+        self.children = []
+        self._driver = driver
+
+    # ---------- WebElement API ------------------------------------------
+    def get_attribute(self, name):
+        if name == "class":
+            return self.attrs.get("class", "")
+        return self.attrs.get(name)
+
+    @property
+    def text(self):
+        parts = []
+        self._collect_text(parts)
+        lines = [re.sub(r"[ \t\r\f\v]+", " ", line).strip() for line in "".join(parts).split("\n")]
+        return "\n".join(line for line in lines if line)
+
+    def _collect_text(self, parts):
+        if self.tag_name in HIDDEN_TAGS or "hidden" in self.attrs:
+            return
+        for child in self.children:
+            if isinstance(child, str):
+                parts.append(child)
+            else:
+                child._collect_text(parts)
+        if self.tag_name in BLOCK_TAGS:
+            parts.append("\n")
+
+    def is_displayed(self):
+        return True
+
+    def is_enabled(self):
+        return "disabled" not in self.attrs
+
+    def click(self):
+        self._driver._on_click(self)
+
+    def find_elements(self, by, value):
+        if by == By.XPATH and value == "..":
+            return [self.parent] if self.parent is not None else []
+        matcher = _matcher(by, value)
+        return [el for el in self._descendants() if matcher(el)]
+
+    def find_element(self, by, value):
+        found = self.find_elements(by, value)
+        if not found:
+            raise NoSuchElementException(f"{by}={value}")
+        return found[0]
+
+    def _descendants(self):
+        stack = [c for c in reversed(self.children) if isinstance(c, Element)]
+        while stack:
+            el = stack.pop()
+            yield el
+            stack.extend(c for c in reversed(el.children) if isinstance(c, Element))
+
+
+def _attr_matches(el, name, op, expected):
+    actual = el.attrs.get(name)
+    if actual is None:
+        return False
+    if op is None:
+        return True
+    if op == "=":
+        return actual == expected
+    if op == "^=":
+        return actual.startswith(expected)
+    if op == "$=":
+        return actual.endswith(expected)
+    if op == "*=":
+        return expected in actual
+    if op == "~=":
+        return expected in actual.split()
+    return False
+
+
+def _simple_matcher(selector):
+    match = SIMPLE_RE.match(selector.strip())
+    if not match:
+        raise ValueError(f"Sélecteur non supporté hors ligne : {selector!r}")
+    tag = match.group("tag")
+    classes, attrs = [], []
+    for cls, name, op, value in PART_RE.findall(match.group("rest")):
+        if cls:
+            classes.append(cls)
+        else:
+            attrs.append((name, op or None, value))
+
+    def matches(el):
+        if tag and tag != "*" and el.tag_name != tag.lower():
+            return False
+        if classes:
+            el_classes = el.attrs.get("class", "").split()
+            if not all(c in el_classes for c in classes):
+                return False
+        return all(_attr_matches(el, name, op, value) for name, op, value in attrs)
+
+    return matches
+
+
+def _matcher(by, value):
+    if by == By.TAG_NAME:
+        tag = value.lower()
+        return lambda el: el.tag_name == tag
+    if by == By.CLASS_NAME:
+        return lambda el: value in el.attrs.get("class", "").split()
+    if by == By.CSS_SELECTOR:
+        alternatives = [_simple_matcher(part) for part in value.split(",")]
+        return lambda el: any(m(el) for m in alternatives)
+    raise ValueError(f"Localisateur non supporté hors ligne : {by}")
+
+
+class _TreeBuilder(HTMLParser):
+    def __init__(self, driver):
+        super().__init__(convert_charrefs=True)
+        self.root = Element("#document", {}, None, driver)
+        self.driver = driver
+        self.current = self.root
+
+    def handle_starttag(self, tag, attrs):
+        el = Element(tag, {k: (v if v is not None else "") for k, v in attrs}, self.current, self.driver)
+        self.current.children.append(el)
+        if tag not in VOID_TAGS:
+            self.current = el
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_TAGS:
+            self.current = self.current.parent
+
+    def handle_endtag(self, tag):
+        # Remonte jusqu'à la balise ouvrante correspondante (HTML mal fermé toléré)
+        node = self.current
+        while node is not None and node.tag_name != tag:
+            node = node.parent
+        if node is not None and node.parent is not None:
+            self.current = node.parent
+
+    def handle_data(self, data):
+        self.current.children.append(data)
+
+
+class OfflineDriver:
+    """Driver-like object over one or more stored pages of the same URL.
+
+    `pages` maps a snapshot kind to its HTML. Clicking the "Informations sur"
+    button switches to the "place_details" page, as the live panel would.
+    """
+
+    def __init__(self, url, pages, initial="place"):
+        self.current_url = url
+        self.title = ""
+        self._pages = pages
+        self._documents = {}
+        self._kind = initial
+
+    def _document(self):
+        if self._kind not in self._documents:
+            builder = _TreeBuilder(self)
+            builder.feed(self._pages.get(self._kind, ""))
+            builder.close()
+            self._documents[self._kind] = builder.root
+        return self._documents[self._kind]
+
+    @property
+    def page_source(self):
+        return self._pages.get(self._kind, "")
+
+    def _on_click(self, element):
+        label = element.get_attribute("aria-label") or ""
+        if label.startswith("Informations sur"):
+            if "place_details" not in self._pages:
+                raise ElementClickInterceptedException("Pas de snapshot du panneau de détails")
+            self._kind = "place_details"
+
+    def find_elements(self, by, value):
+        return self._document().find_elements(by, value)
+
+    def find_element(self, by, value):
+        return self._document().find_element(by, value)
+
+    def execute_script(self, *args, **kwargs):
+        raise OfflineScriptError("Pas de JavaScript en mode hors ligne")
+
+    def quit(self):
+        pass
@@ -0,0 +1,136 @@
+import time
+import logging
+from collections import deque
+
+from config import settings
+
+
+class PacingController:
+    """AIMD controller for the delay between pages, worker count and wait budgets.
+
+    Every page reports its latency and outcome through `record()`. After a
+    window of clean pages the delay shrinks additively (and one worker is
+    added once the delay bottoms out); a timeout or a throttling page cuts
+    the rate multiplicatively. Wait budgets follow the observed latency.
+    Pauses end early once `stop_event` is set.
+    """
+
+    OK = "ok"
+    TIMEOUT = "timeout"
+    THROTTLED = "throttled"
+    ERROR = "error"
+
+    # Redirections Google quand il nous ralentit ou exige un consentement
+    BLOCKED_URL_MARKERS = ("/sorry/", "consent.google.")
+    BLOCKED_TITLE_MARKERS = ("unusual traffic", "trafic exceptionnel")
+
+    DELAY_STEP_SEC = 0.1
+    TIMEOUT_BACKOFF = 1.5
+    THROTTLE_BACKOFF = 2.0
+    THROTTLE_COOLDOWN_SEC = 60
+
+    def __init__(self, logger: logging.Logger = None, initial_delay=None, max_workers=None, stop_event=None):
+        self.logger = logger
+        self.stop_event = stop_event
+        self.delay = settings.PACING_INITIAL_DELAY_SEC if initial_delay is None else initial_delay
+        self.workers = settings.PACING_MIN_WORKERS
+        self.max_workers = settings.PACING_MAX_WORKERS if max_workers is None else max_workers
+        self.wait_scale = 1.0
+        self.counts = {self.OK: 0, self.TIMEOUT: 0, self.THROTTLED: 0, self.ERROR: 0}
+        self._latencies = deque(maxlen=50)
+        self._clean_streak = 0
+
+    @classmethod
+    def offline(cls, logger: logging.Logger = None):
+        """Zero delay and zero wait budgets, for a DOM that is already fully loaded."""
+        pacing = cls(logger, initial_delay=0)
+        pacing.wait_scale = 0
+        return pacing
+
+    # ---------- inputs --------------------------------------------------
+    def is_blocked(self, driver) -> bool:
+        """True if the driver landed on a consent or "unusual traffic" page."""
+        try:
+            url = driver.current_url or ""
+            title = (driver.title or "").lower()
+        except Exception:
+            return False
+        return any(m in url for m in self.BLOCKED_URL_MARKERS) or \
+            any(m in title for m in self.BLOCKED_TITLE_MARKERS)
+
+    def record(self, latency, outcome=OK):
+        self.counts[outcome] = self.counts.get(outcome, 0) + 1
+        if latency is not None:
+            self._latencies.append(latency)
+
+        if outcome == self.OK:
+            self._clean_streak += 1
+            if self._clean_streak >= settings.PACING_WINDOW:
+                self._clean_streak = 0
+                self._increase()
+        elif outcome in (self.TIMEOUT, self.THROTTLED):
+            self._clean_streak = 0
+            self._decrease(outcome)
+        else:
+            self._clean_streak = 0
+
+    # ---------- AIMD ----------------------------------------------------
+    def _increase(self):
+        if self.delay > settings.PACING_MIN_DELAY_SEC:
+            self.delay = max(settings.PACING_MIN_DELAY_SEC, self.delay - self.DELAY_STEP_SEC)
+        elif self.workers < self.max_workers:
+            self.workers += 1
+        # Les pages répondent : on resserre les attentes vers la latence observée
+        self.wait_scale = max(self._latency_scale(), self.wait_scale * 0.9)
+        self._log("speed up")
+
+    def _decrease(self, outcome):
+        factor = self.THROTTLE_BACKOFF if outcome == self.THROTTLED else self.TIMEOUT_BACKOFF
+        self.delay = min(settings.PACING_MAX_DELAY_SEC, self.delay * factor)
+        self.workers = max(settings.PACING_MIN_WORKERS, self.workers // 2)
+        if outcome == self.TIMEOUT:
+            self.wait_scale = min(2.0, self.wait_scale * self.TIMEOUT_BACKOFF)
+        self._log(f"back off ({outcome})")
+
+    def _latency_scale(self):
+        """Smallest wait scale that still covers 3x the p90 page latency."""
+        if len(self._latencies) < 5:
+            return 1.0
+        ordered = sorted(self._latencies)
+        p90 = ordered[int(len(ordered) * 0.9) - 1]
+        return min(1.0, max(0.3, 3 * p90 / settings.WAIT_BUDGETS_SEC["page"]))
+
+    # ---------- outputs -------------------------------------------------
+    def wait(self, name) -> float:
+        """Current wait budget (seconds) for a WebDriverWait of kind `name`."""
+        return settings.WAIT_BUDGETS_SEC[name] * self.wait_scale
+
+    def sleep(self, seconds):
+        """Sleep `seconds`, or until `stop_event` is set."""
+        if self.stop_event is not None:
+            self.stop_event.wait(seconds)
+        else:
+            time.sleep(seconds)
+
+    def pause(self):
+        self.sleep(self.delay)
+
+    def cooldown(self):
+        """Long pause after a throttling page, on top of the multiplicative back-off."""
+        if self.logger:
+            self.logger.warning(f"Page de blocage détectée, pause de {self.THROTTLE_COOLDOWN_SEC}s.")
+        self.sleep(self.THROTTLE_COOLDOWN_SEC)
+
+    def snapshot(self):
+        latencies = sorted(self._latencies)
+        return {
+            "delay": round(self.delay, 3),
+            "workers": self.workers,
+            "wait_scale": round(self.wait_scale, 3),
+            "latency_p50": round(latencies[len(latencies) // 2], 3) if latencies else None,
+            **self.counts,
+        }
+
+    def _log(self, action):
+        if self.logger:
+            self.logger.info(f"Pacing {action}: {self.snapshot()}")
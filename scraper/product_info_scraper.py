@@ -1,42 +1,136 @@
+import hashlib
 import json
 import os
 import re
 import time
 from datetime import datetime
 import logging
+from collections import deque
 
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import (
+    TimeoutException, NoSuchElementException, StaleElementReferenceException,
+    ElementClickInterceptedException,
+)
+
+from scraper.pacing import PacingController
+from scraper.products import ProductExtractor
+from scraper.product_normalizer import ProductNormalizer
+from scraper.retry_queue import MISSING_FIELD, THROTTLING, classify
+from config import settings
+
+def load_latest_links(input_folder, logger):
+    """Links (name + href) of the most recent products_<timestamp>.json in `input_folder`."""
+    pattern = "products_"
+    files = [f for f in os.listdir(input_folder) if f.startswith(pattern) and f.endswith(".json")]
+    if not files:
+        logger.error("Aucun fichier de produits trouvé dans le dossier 'out/'.")
+        raise FileNotFoundError("Aucun fichier de produits trouvé dans le dossier 'out/'.")
+
+    files.sort(key=lambda x: datetime.strptime(x.split("_")[1] + "_" + x.split("_")[2].replace(".json", ""), "%Y-%m-%d_%H-%M-%S"), reverse=True)
+    latest_file = files[0]
+
+    with open(os.path.join(input_folder, latest_file), "r", encoding="utf-8") as f:
+        data = json.load(f)
+
+    # Retourne la liste complète des objets avec name + href
+    return [item for item in data if "href" in item and "name" in item]
+
 
 class ProductInfoScraper:
-    def __init__(self, driver, key, logger: logging.Logger, input_folder="out", output_folder="out"):
-        self.driver = driver
+    CONTACT_SELECTOR = '[data-item-id^="address"], [data-item-id^="phone"], [data-item-id^="authority"]'
+
+    # Sections de la fiche et les champs qu'elles remplissent
+    SECTIONS = {
+        "contacts": ("address", "phone", "authority"),
+        "rating": ("rating", "number_of_rates"),
+        "details": ("details",),
+    }
+    FIELDS = tuple(f for fields in SECTIONS.values() for f in fields)
+
+    @classmethod
+    def resolve_fields(cls, fields=None):
+        """Requested fields in scraping order; None or empty means all of them."""
+        if not fields:
+            return cls.FIELDS
+        unknown = set(fields) - set(cls.FIELDS) - {"name", "url"}
+        if unknown:
+            raise ValueError(f"Champs inconnus : {', '.join(sorted(unknown))}")
+        return tuple(f for f in cls.FIELDS if f in fields)
+
+    def __init__(self, driver, key, logger: logging.Logger, input_folder="out", output_folder="out",
+                 change_detector=None, progress=None, stop_event=None, pacing=None,
+                 http_fetcher=None, tabs=1, watchdog=None, snapshot_store=None, links=None,
+                 result_store=None, retry_queue=None, fields=None, resume=None):
+        self._driver = driver
+        self.key = key
+        self.watchdog = watchdog
         self.logger = logger
         self.input_folder = input_folder
         self.output_folder = output_folder
         self.output_path = os.path.join(self.output_folder, f"product_details_live_{key}.json")
-        self.links = self._load_latest_urls()
-        self.results = self._load_existing_data()
+        self.run_path = os.path.join(self.output_folder, f"run_{key}.json")
+        self.change_detector = change_detector
+        self.progress = progress
+        self.stop_event = stop_event
+        self.pacing = pacing or PacingController(logger)
+        self.http_fetcher = http_fetcher
+        self.tabs = max(1, tabs)
+        self.snapshot_store = snapshot_store
+        self.result_store = result_store
+        self.retry_queue = retry_queue
+        # Projection : seules les sections qui alimentent un champ demandé sont visitées
+        self.fields = self.resolve_fields(fields)
+        self.sections = [sec for sec, fs in self.SECTIONS.items() if any(f in self.fields for f in fs)]
+        self.poll_frequency = 0.5
+        self.links = self._load_latest_urls() if links is None else links
+        self.run_id = self._run_id(self.links)
+        self.run_finished = False
+        self.results = self._load_existing_data(resume)
+        self._index = {entry["url"]: i for i, entry in enumerate(self.results)}
+
+    @property
+    def driver(self):
+        # Avec un watchdog, la session peut avoir été remplacée entre deux pages
+        return self.watchdog.driver if self.watchdog else self._driver
 
     def _load_latest_urls(self):
-        pattern = "products_"
-        files = [f for f in os.listdir(self.input_folder) if f.startswith(pattern) and f.endswith(".json")]
-        if not files:
-            self.logger.error("Aucun fichier de produits trouvé dans le dossier 'out/'.")
-            raise FileNotFoundError("Aucun fichier de produits trouvé dans le dossier 'out/'.")
+        return load_latest_links(self.input_folder, self.logger)
+
 
-        files.sort(key=lambda x: datetime.strptime(x.split("_")[1] + "_" + x.split("_")[2].replace(".json", ""), "%Y-%m-%d_%H-%M-%S"), reverse=True)
-        latest_file = files[0]
+    @staticmethod
+    def _run_id(links):
+        """Identifies a crawl by its result list: same links and same cards, same run."""
+        raw = "\n".join(f"{link['href']}\x1f{link.get('fingerprint', '')}" for link in links)
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
 
-        with open(os.path.join(self.input_folder, latest_file), "r", encoding="utf-8") as f:
-            data = json.load(f)
+    def _run_state(self):
+        try:
+            with open(self.run_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {}
 
-        # Retourne la liste complète des objets avec name + href
-        return [item for item in data if "href" in item and "name" in item]
+    def _write_run_state(self, finished):
+        with open(self.run_path, "w", encoding="utf-8") as f:
+            json.dump({"run": self.run_id, "finished": finished}, f)
 
+    def _load_existing_data(self, resume=None):
+        """Saved records to resume from; a new crawl starts from an empty record set.
 
-    def _load_existing_data(self):
+        With `resume` None, the output file is picked up only when it belongs to an
+        unfinished run over the same links; True always picks it up (re-tries of
+        the last run), False never does.
+        """
+        if self.result_store:
+            return []  # Mode distribué : rien n'est repris du fichier local
+        if resume is None:
+            state = self._run_state()
+            resume = state.get("run") == self.run_id and not state.get("finished", True)
+        if not resume:
+            return []
         if os.path.exists(self.output_path):
             with open(self.output_path, "r", encoding="utf-8") as f:
                 try:
@@ -48,93 +142,480 @@ class ProductInfoScraper:
                     return []
         return []
 
-    def _has_been_scraped(self, href):
-        return any(entry["url"] == href for entry in self.results)
+    def _has_been_scraped(self, href, fingerprint=None):
+        """True if `href` is already in the output and its listing has not changed since."""
+        if href not in self._index:
+            return False
+        if fingerprint is None:
+            return True
+        return self.results[self._index[href]].get("fingerprint", fingerprint) == fingerprint
+
+    def start_run(self):
+        """Mark this run as in progress; a new crawl also empties the output file."""
+        if self.result_store:
+            return
+        if self.results:
+            self.logger.info(f" Reprise du passage interrompu ({len(self.results)} fiches).")
+        else:
+            with open(self.output_path, "w", encoding="utf-8") as f:
+                json.dump(self.results, f)
+        self._write_run_state(finished=False)
+
+    def finish_run(self):
+        """Mark this run as complete: the next crawl starts over instead of resuming it."""
+        self.run_finished = True
+        if not self.result_store:
+            self._write_run_state(finished=True)
 
     def _save_one(self, result):
-        self.results.append(result)
+        if result["url"] in self._index:
+            self.results[self._index[result["url"]]] = result
+        else:
+            self._index[result["url"]] = len(self.results)
+            self.results.append(result)
+        if self.result_store:
+            # Mode distribué : le store partagé remplace le fichier local
+            self.result_store.save(self.key, result)
+            return
         with open(self.output_path, "w", encoding="utf-8") as f:
             json.dump(self.results, f, indent=2, ensure_ascii=False)
 
     def scrape_info(self):
-        for index, link in enumerate(self.links, start=1):
-            href = link["href"]
-            name = link["name"]
+        self.start_run()
+        if self.progress:
+            self.progress.start_places(len(self.links))
+
+        if self.tabs > 1:
+            self._scrape_with_tabs()
+        else:
+            for index, link in enumerate(self.links, start=1):
+                if self._cancelled(index - 1):
+                    break
+
+                self._scrape_link(index, link)
+                self._place_done(link)
+
+        if self.retry_queue is not None and not (self.stop_event and self.stop_event.is_set()):
+            self.drain_retries()
+
+        if self.http_fetcher:
+            self.http_fetcher.report()
 
-            if self._has_been_scraped(href):
+        if not (self.stop_event and self.stop_event.is_set()):
+            self.finish_run()
+
+    def _cancelled(self, done):
+        if self.stop_event and self.stop_event.is_set():
+            self.logger.info(f" Annulation demandée : arrêt après {done}/{len(self.links)} liens.")
+            return True
+        return False
+
+    def _place_done(self, link):
+        if self.progress:
+            self.progress.place_done(name=link["name"], pacing=self.pacing.snapshot())
+
+    def _prepare(self, index, link):
+        """Settle a link without the browser if possible; else return (data, sections) still to scrape."""
+        href = link["href"]
+        name = link["name"]
+        fingerprint = link.get("fingerprint")
+
+        previous = {}
+        retry = []
+        if self._has_been_scraped(href, fingerprint):
+            previous = self.results[self._index[href]]
+            if not self._uncovered_fields(previous):
                 self.logger.info(f" Déjà traité : {href}")
+                return None
+
+        if self.change_detector:
+            cached = self.change_detector.cached_record(href, fingerprint)
+            if cached and cached.get("complete", True) and not self._uncovered_fields(cached):
+                self._save_one(cached)
+                self.logger.info(f" Inchangé depuis le dernier passage : {href}")
+                return None
+            if cached and not previous:
+                # Fiche inchangée mais incomplète : seuls ses champs perdus sont refaits
+                previous = cached
+                retry = [f for f in cached.get("missing_fields", ()) if f in self.fields]
+
+        self.logger.info(f"\n Scraping {index}/{len(self.links)}: {name}")
+        # Une fiche déjà scrapée avec une autre projection est complétée, pas refaite
+        data = self.new_record(href, name, fingerprint, previous)
+        wanted = self._uncovered_fields(previous) + retry
+
+        # HTTP d'abord, si un champ voulu peut en venir : Selenium ne sert qu'aux sections encore manquantes
+        if self.http_fetcher and any(f in self.http_fetcher.FIELDS for f in wanted):
+            data.update({k: v for k, v in self._fetch_http(href).items() if k in wanted})
+        sections = [sec for sec in self.sections
+                    if any(f in wanted and f not in data for f in self.SECTIONS[sec])]
+        if not sections:
+            self._flag_completeness(data)
+            self._save_one(data)
+            self.logger.info(f" Données sauvegardées (HTTP) pour : {href}")
+            return None
+
+        return data, sections
+
+    def _fetch_http(self, href):
+        """GET the place page over HTTP, paced and counted like a browser load."""
+        self.pacing.pause()
+        fetched = self.http_fetcher.fetch(href)
+        # Sans latence : celle d'un GET ne doit pas resserrer les attentes Selenium
+        self.pacing.record(None, PacingController.ERROR if fetched is None else PacingController.OK)
+        return fetched or {}
+
+    @staticmethod
+    def new_record(href, name, fingerprint=None, previous=None):
+        """Record a place starts from before extraction, live or from a snapshot.
+
+        Keeps the fields of `previous` but not its completeness flags, which
+        _flag_completeness sets again once the sections are extracted.
+        """
+        data = {k: v for k, v in (previous or {}).items() if k not in ("missing_fields", "complete")}
+        data.update({"url": href, "name": name})
+        if fingerprint:
+            data["fingerprint"] = fingerprint
+        data.update(ProductExtractor.coordinates(href))
+        return data
+
+    def _scrape_link(self, index, link):
+        job = self._prepare(index, link)
+        if job is None:
+            return
+        data, sections = job
+        if self.watchdog:
+            self.watchdog.maybe_recycle()
+        self.pacing.pause()
+        self._collect(data, sections, time.monotonic(), navigate=lambda: self.driver.get(data["url"]))
+
+    def _collect(self, data, sections, started, navigate=None):
+        """Extract the requested sections from the current window and save the record."""
+        href = data["url"]
+        try:
+            if navigate:
+                navigate()
+
+            if self.pacing.is_blocked(self.driver):
+                self.pacing.record(time.monotonic() - started, PacingController.THROTTLED)
+                self.pacing.cooldown()
+                self.logger.error(f" Erreur scraping {href} : page de blocage")
+                self._schedule_retry(data, sections, THROTTLING, "page de blocage")
+                return
+
+            self.wait_ready(sections)
+            latency = time.monotonic() - started
+            self._snapshot(data, "place")
+            self.extract_current(data, sections)
+
+            # Sauvegarde immédiate
+            missing = self._flag_completeness(data)
+            self._save_one(data)
+            self.pacing.record(latency, PacingController.OK)
+            self.logger.info(f" Données sauvegardées pour : {href}")
+            if missing:
+                self._schedule_retry(data, missing, MISSING_FIELD,
+                                     f"champs manquants : {', '.join(data['missing_fields'])}")
+            elif self.retry_queue is not None:
+                self.retry_queue.resolve(href)
+
+        except TimeoutException as e:
+            self.pacing.record(time.monotonic() - started, PacingController.TIMEOUT)
+            self.logger.error(f" Erreur scraping {href} : timeout {e}")
+            self._schedule_retry(data, sections, classify(e), e)
+            if self.watchdog:
+                self.watchdog.report_failure(e)
+        except Exception as e:
+            self.pacing.record(None, PacingController.ERROR)
+            self.logger.error(f" Erreur scraping {href} : {e}")
+            self._schedule_retry(data, sections, classify(e), e)
+            if self.watchdog:
+                self.watchdog.report_failure(e)
+        finally:
+            if self.watchdog:
+                self.watchdog.page_done()
+
+    # ---------- complétude et réessais -------------------------------------
+    def _uncovered_fields(self, record):
+        """Requested fields that `record` neither has nor already tried to get."""
+        tried = record.get("missing_fields", ())
+        return [f for f in self.fields if f not in record and f not in tried]
+
+    def _flag_completeness(self, data):
+        """Set `complete`/`missing_fields` on the record; return the sections to redo.
+
+        Extractors store "" (or []) for what the place simply lacks, so only
+        fields lost to a timeout or an error are missing.
+        """
+        missing_fields = [f for f in self.fields if f not in data]
+        data["missing_fields"] = missing_fields
+        data["complete"] = not missing_fields
+        return [sec for sec in self.sections if any(f in missing_fields for f in self.SECTIONS[sec])]
+
+    def _schedule_retry(self, data, sections, failure, error=""):
+        if self.retry_queue is None:
+            return
+        link = {"href": data["url"], "name": data.get("name", "")}
+        if data.get("fingerprint"):
+            link["fingerprint"] = data["fingerprint"]
+        self.retry_queue.push(link, failure, sections, error)
+
+    def enqueue_incomplete(self):
+        """Queue every saved record flagged incomplete, for its missing sections only."""
+        count = 0
+        for record in self.results:
+            if record.get("complete", True):
+                continue
+            missing = set(record.get("missing_fields", [])) & set(self.fields)
+            sections = [sec for sec in self.sections if missing & set(self.SECTIONS[sec])]
+            if not sections:
                 continue
+            self._schedule_retry(record, sections, MISSING_FIELD, "incomplet")
+            count += 1
+        return count
 
-            self.logger.info(f"\n Scraping {index}/{len(self.links)}: {name}")
-            try:
-                self.driver.get(href)
-                time.sleep(1)
-
-                data = {
-                    "url": href,
-                    "name": name  # ajoute le nom ici
-                }
-
-                WebDriverWait(self.driver, 15).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, '[data-item-id^="address"], [data-item-id^="phone"], [data-item-id^="authority"]'))
-                )
-                items = self.driver.find_elements(By.CSS_SELECTOR, '[data-item-id^="address"], [data-item-id^="phone"], [data-item-id^="authority"]')
-
-                for item in items:
-                    item_id = item.get_attribute("data-item-id")
-                    label = next((p for p in ["address", "phone", "authority"] if item_id.startswith(p)), "unknown")
+    def drain_retries(self, max_wait=None):
+        """Re-scrape queued places as they become due, merging into the saved records.
+
+        Waits for backoffs up to `max_wait` seconds in total (settings.RETRY_MAX_WAIT_SEC).
+        """
+        max_wait = settings.RETRY_MAX_WAIT_SEC if max_wait is None else max_wait
+        waited = 0.0
+        self.logger.info(f" {len(self.retry_queue)} place(s) en file de réessai.")
+        while len(self.retry_queue):
+            if self.stop_event and self.stop_event.is_set():
+                break
+            due = self.retry_queue.due()
+            if not due:
+                delay = self.retry_queue.next_due() - time.time()
+                if waited + delay > max_wait:
+                    self.logger.info(f" {len(self.retry_queue)} réessai(s) laissé(s) pour plus tard.")
+                    break
+                # Une annulation interrompt l'attente au lieu de la subir
+                if self.stop_event:
+                    self.stop_event.wait(max(delay, 0))
+                else:
+                    time.sleep(max(delay, 0))
+                waited += max(delay, 0)
+                continue
+
+            for entry in due:
+                href = entry["link"]["href"]
+                previous = self.results[self._index[href]] if href in self._index else {}
+                data = self.new_record(href, entry["link"]["name"], entry["link"].get("fingerprint"), previous)
+                sections = [sec for sec in entry["sections"] or self.sections if sec in self.sections]
+                self.logger.info(f" Réessai ({entry['failure']}, tentative {entry['attempts'] + 1}) : {href}")
+                if self.watchdog:
+                    self.watchdog.maybe_recycle()
+                self.pacing.pause()
+                self._collect(data, sections, time.monotonic(), navigate=lambda: self.driver.get(href))
+
+    # ---------- mode multi-onglets ------------------------------------------
+    def _start_load(self, handle, data):
+        """Start loading `data["url"]` in tab `handle` without waiting for it."""
+        self.driver.switch_to.window(handle)
+        self.pacing.pause()
+        # On vide l'ancien document pour que l'attente ne matche pas la fiche précédente
+        self.driver.execute_script(
+            "if (document.body) { document.body.remove(); } window.location.assign(arguments[0]);",
+            data["url"],
+        )
+        return time.monotonic()
+
+    def _open_tabs(self):
+        handles = [self.driver.current_window_handle]
+        for _ in range(self.tabs - 1):
+            self.driver.switch_to.new_window("tab")
+            handles.append(self.driver.current_window_handle)
+        return handles
+
+    def _scrape_with_tabs(self):
+        """Pipeline place loads over several tabs of the same browser.
+
+        While the oldest tab is being extracted, the others keep loading; each
+        tab gets its next href as soon as it has been collected. The number of
+        tabs in flight follows the pacing controller's worker count, capped
+        at `self.tabs`. When the watchdog wants a new browser, tabs stop being
+        refilled until the ones in flight are collected, then it is recycled.
+        """
+        # Tous les onglets travaillent dès le départ ; l'AIMD en retire si Maps ralentit
+        self.pacing.max_workers = max(self.pacing.max_workers, self.tabs)
+        self.pacing.workers = max(self.pacing.workers, self.tabs)
+        handles = self._open_tabs()
+        jobs = ((i, link) for i, link in enumerate(self.links, start=1))
+        in_flight = deque()  # (handle, link, data, sections, started), plus ancien en tête
+        idle = deque(handles)
+        done = 0
+        exhausted = False
+        recycle_reason = None
+
+        try:
+            while True:
+                if self.watchdog and recycle_reason is None:
+                    recycle_reason = self.watchdog.recycle_reason()
+                # Recyclage une fois les onglets en vol vidés
+                if recycle_reason and not in_flight:
+                    self.watchdog.recycle(recycle_reason)
+                    recycle_reason = None
+                    handles = self._open_tabs()
+                    idle = deque(handles)
+
+                # Remplit les onglets libres
+                while (not exhausted and not recycle_reason and idle
+                       and len(in_flight) < min(self.tabs, self.pacing.workers)):
+                    if self._cancelled(done):
+                        exhausted = True
+                        break
                     try:
-                        font_el = WebDriverWait(item, 5).until(EC.presence_of_element_located((By.CLASS_NAME, "fontBodyMedium")))
-                        text = font_el.text.strip()
-                    except:
-                        text = ""
-
-                    if label == "phone" and not text:
-                        parts = item_id.split(":")
-                        if len(parts) >= 3:
-                            text = parts[2]
-
-                    data[label] = text
-
-                # Rating & number of rates
-                spans = self.driver.find_elements(By.CLASS_NAME, "fontBodyMedium")
-                valid_spans = [s.text.strip() for c in spans for s in c.find_elements(By.TAG_NAME, "span") if s.text.strip()]
-                if len(valid_spans) >= 1:
-                    data["rating"] = valid_spans[0]
-                if len(valid_spans) >= 3:
-                    data["number_of_rates"] = valid_spans[2]
-
-                # Informations détaillées
+                        index, link = next(jobs)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    job = self._prepare(index, link)
+                    if job is None:
+                        done += 1
+                        self._place_done(link)
+                        continue
+                    handle = idle.popleft()
+                    data, sections = job
+                    try:
+                        started = self._start_load(handle, data)
+                    except Exception as e:
+                        self.pacing.record(None, PacingController.ERROR)
+                        self.logger.error(f" Erreur scraping {data['url']} : {e}")
+                        self._schedule_retry(data, sections, classify(e), e)
+                        if self.watchdog:
+                            self.watchdog.report_failure(e)
+                        idle.append(handle)
+                        done += 1
+                        self._place_done(link)
+                        break  # le watchdog sonde la session avant le prochain chargement
+                    in_flight.append((handle, link, data, sections, started))
+
+                if not in_flight:
+                    if exhausted:
+                        break
+                    continue
+
+                handle, link, data, sections, started = in_flight.popleft()
+                # Une session morte échoue ici : la fiche est réessayée et le watchdog prévenu
+                self._collect(data, sections, started,
+                              navigate=lambda: self.driver.switch_to.window(handle))
+                idle.append(handle)
+                done += 1
+                self._place_done(link)
+        finally:
+            # Ne garde que le premier onglet pour les étapes suivantes
+            for handle in handles[1:]:
                 try:
-                    info_button = WebDriverWait(self.driver, 5).until(
-                        EC.element_to_be_clickable((By.CSS_SELECTOR, 'button[aria-label^="Informations sur"]'))
-                    )
-                    info_button.click()
-                    WebDriverWait(self.driver, 5).until(
-                        EC.presence_of_all_elements_located((By.CLASS_NAME, "fontBodyMedium"))
-                    )
-                    divs = self.driver.find_elements(By.CLASS_NAME, "fontBodyMedium")
-                    if len(divs) >= 2:
-                        classes = divs[1].get_attribute("class").split()
-                        if len(classes) >= 2:
-                            class_name = classes[1]
-                            sections = self.driver.find_elements(By.CSS_SELECTOR, f'div.{class_name.replace(" ", ".")}')
-                            details = []
-                            for sec in sections:
-                                try:
-                                    title = sec.find_element(By.TAG_NAME, "h2").text.strip()
-                                    items = [re.sub(r'^[^\w\d]+', '', li.text.strip()) for li in sec.find_elements(By.TAG_NAME, "li")]
-                                    details.append({title: items})
-                                except:
-                                    continue
-                            data["details"] = details
-                except:
+                    self.driver.switch_to.window(handle)
+                    self.driver.close()
+                except Exception:
                     pass
+            try:
+                self.driver.switch_to.window(handles[0])
+            except Exception:
+                pass
 
-                # Sauvegarde immédiate
-                self._save_one(data)
-                self.logger.info(f" Données sauvegardées pour : {href}")
+    # ---------- extraction par section ------------------------------------
+    def _wait(self, target, name):
+        return WebDriverWait(target, self.pacing.wait(name), poll_frequency=self.poll_frequency)
 
-            except Exception as e:
-                self.logger.error(f" Erreur scraping {href} : {e}")
-                continue
+    def wait_ready(self, sections):
+        """Wait until the place page shows what the requested sections need."""
+        ready_selector = self.CONTACT_SELECTOR if "contacts" in sections else "h1"
+        self._wait(self.driver, "page").until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, ready_selector))
+        )
+
+    def extract_current(self, data, sections):
+        """Fill `data` with the requested sections of the page loaded in the driver."""
+        if "contacts" in sections:
+            self._extract_contacts(data)
+        if "rating" in sections:
+            self._extract_rating(data)
+        if "details" in sections:
+            self._extract_details(data)
+        return data
+
+    def _snapshot(self, data, kind):
+        if self.snapshot_store:
+            self.snapshot_store.save(data["url"], self.driver.page_source, kind,
+                                     key=self.key, name=data.get("name", ""))
+
+    def _extract_contacts(self, data):
+        items = self.driver.find_elements(By.CSS_SELECTOR, self.CONTACT_SELECTOR)
+        seen = set()
+
+        for item in items:
+            item_id = item.get_attribute("data-item-id")
+            label = next((p for p in ["address", "phone", "authority"] if item_id.startswith(p)), "unknown")
+            if label not in self.fields:
+                continue  # ni attente ni lecture pour un champ hors projection
+            seen.add(label)
+            try:
+                font_el = self._wait(item, "element").until(EC.presence_of_element_located((By.CLASS_NAME, "fontBodyMedium")))
+                text = font_el.text.strip()
+            except (TimeoutException, StaleElementReferenceException):
+                text = ""
+
+            if label == "phone" and not text:
+                parts = item_id.split(":")
+                if len(parts) >= 3:
+                    text = parts[2]
+
+            if text:
+                data[label] = text
+            # Sinon le champ reste absent : manquant, donc réessayé
+
+        # Pas d'élément pour ce champ : la fiche n'en a pas, c'est une valeur définitive
+        for label in self.SECTIONS["contacts"]:
+            if label in self.fields and label not in seen:
+                data[label] = ""
+
+    def _extract_rating(self, data):
+        # Rating & number of rates
+        spans = self.driver.find_elements(By.CLASS_NAME, "fontBodyMedium")
+        valid_spans = [s.text.strip() for c in spans for s in c.find_elements(By.TAG_NAME, "span") if s.text.strip()]
+        # Fiche sans avis : note et nombre d'avis vides, pas manquants
+        if "rating" in self.fields:
+            data["rating"] = valid_spans[0] if len(valid_spans) >= 1 else ""
+        if "number_of_rates" in self.fields:
+            data["number_of_rates"] = ProductNormalizer.rates_count(valid_spans[2]) if len(valid_spans) >= 3 else ""
+
+    def _extract_details(self, data):
+        # Informations détaillées
+        try:
+            info_button = self._wait(self.driver, "details").until(
+                EC.element_to_be_clickable((By.CSS_SELECTOR, 'button[aria-label^="Informations sur"]'))
+            )
+        except TimeoutException:
+            # Pas de panneau "Informations sur" : la fiche n'a pas de détails
+            data["details"] = []
+            return
+
+        try:
+            info_button.click()
+            self._wait(self.driver, "details").until(
+                EC.presence_of_all_elements_located((By.CLASS_NAME, "fontBodyMedium"))
+            )
+            self._snapshot(data, "place_details")
+            divs = self.driver.find_elements(By.CLASS_NAME, "fontBodyMedium")
+            details = []
+            if len(divs) >= 2:
+                classes = divs[1].get_attribute("class").split()
+                if len(classes) >= 2:
+                    class_name = classes[1]
+                    sections = self.driver.find_elements(By.CSS_SELECTOR, f'div.{class_name.replace(" ", ".")}')
+                    for sec in sections:
+                        try:
+                            title = sec.find_element(By.TAG_NAME, "h2").text.strip()
+                            items = [re.sub(r'^[^\w\d]+', '', li.text.strip()) for li in sec.find_elements(By.TAG_NAME, "li")]
+                            details.append({title: items})
+                        except (NoSuchElementException, StaleElementReferenceException):
+                            continue
+            data["details"] = details
+        # Panneau présent mais illisible : "details" n'est pas rempli, donc réessayé.
+        # Une session morte, elle, doit remonter jusqu'au watchdog.
+        except (TimeoutException, ElementClickInterceptedException, StaleElementReferenceException):
+            pass
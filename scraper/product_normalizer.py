@@ -1,4 +1,5 @@
 import json
+import re
 from typing import List, Dict, Any
 import logging
 
@@ -14,10 +15,13 @@ class ProductNormalizer:
         "details",
     ]
 
-    def __init__(self, input_path: str, output_path: str = None, logger: logging.Logger = None):
+    def __init__(self, input_path: str, output_path: str = None, logger: logging.Logger = None,
+                 fields: List[str] = None):
         self.input_path = input_path
         self.output_path = output_path
         self.logger = logger
+        # Avec une projection, seuls les champs demandés sont obligatoires (et gardés)
+        self.mandatory_keys = [k for k in self.MANDATORY_KEYS if k == "name" or not fields or k in fields]
 
     @staticmethod
     def is_numeric_string(value: Any) -> bool:
@@ -30,38 +34,49 @@ class ProductNormalizer:
         except ValueError:
             return False
 
+    @staticmethod
+    def rates_count(value: Any) -> str:
+        """Review count in the format Maps displays, "(1234)", whatever the source gave."""
+        digits = re.sub(r"\D", "", str(value or ""))
+        return f"({digits})" if digits else ""
+
     def normalize_product(self, product: Dict[str, Any]) -> Dict[str, Any]:
         normalized = dict(product)  # copie
 
         # Ajouter clés manquantes sauf 'url' (pas obligatoire)
-        for key in self.MANDATORY_KEYS:
+        for key in self.mandatory_keys:
             if key not in normalized:
                 normalized[key] = ""
 
         rating = normalized.get("rating", "")
         number_of_rates = normalized.get("number_of_rates", "")
 
-        # rating doit être un nombre sinon fallback sur number_of_rates
-        if not self.is_numeric_string(rating):
+        # rating doit être un nombre sinon fallback sur number_of_rates (si rating est demandé)
+        if "rating" in self.mandatory_keys and not self.is_numeric_string(rating):
             if self.is_numeric_string(number_of_rates):
                 normalized["rating"] = number_of_rates
                 normalized["number_of_rates"] = ""
             else:
                 normalized["rating"] = ""
                 normalized["number_of_rates"] = ""
+        if normalized.get("number_of_rates"):
+            normalized["number_of_rates"] = self.rates_count(normalized["number_of_rates"])
 
         # details doit être une liste
         if not isinstance(normalized.get("details", []), list):
             normalized["details"] = []
 
-        # Construction de l'ordre des clés, avec url en 2e si présente
+        # Construction de l'ordre des clés, avec url en 2e et les coordonnées si présentes
         keys_order = ["name"]
         if "url" in normalized:
             keys_order.append("url")
+        if "lat" in normalized and "lng" in normalized:
+            keys_order.extend(["lat", "lng"])
         keys_order.extend(
-            [k for k in self.MANDATORY_KEYS if k != "name" and k != "details"]
+            [k for k in self.mandatory_keys if k != "name" and k != "details"]
         )
-        keys_order.append("details")
+        if "details" in self.mandatory_keys:
+            keys_order.append("details")
 
         result = {key: normalized.get(key, "") for key in keys_order}
 
@@ -92,3 +107,5 @@ class ProductNormalizer:
                 self.logger.info(json.dumps(normalized, ensure_ascii=False, indent=2))
             else:
                 print(json.dumps(normalized, ensure_ascii=False, indent=2))
+
+        return normalized
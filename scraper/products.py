@@ -1,12 +1,27 @@
 import json
 import os
 import logging
+import re
 from datetime import datetime
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import NoSuchElementException, StaleElementReferenceException
+from scraper.change_detector import ChangeDetector
+
+# Coordonnées de la fiche encodées dans le href Maps : ...!3d<lat>!4d<lng>...
+COORDINATES_RE = re.compile(r"!3d(-?\d+(?:\.\d+)?)!4d(-?\d+(?:\.\d+)?)")
+
 
 class ProductExtractor:
+    @staticmethod
+    def coordinates(href: str) -> dict:
+        """{"lat", "lng"} of a place href, or {} when it carries none."""
+        match = COORDINATES_RE.search(href or "")
+        if not match:
+            return {}
+        return {"lat": float(match.group(1)), "lng": float(match.group(2))}
+
     def __init__(self, driver, logger, filter_by_first_class=False):
         self.driver = driver
         self.logger = logger
@@ -46,19 +61,53 @@ class ProductExtractor:
             products.append({
                 "name": text,
                 "class": class_attr,
-                "href": href
+                "href": href,
+                "fingerprint": ChangeDetector.listing_fingerprint(text, self._card_text(a)),
+                **self.coordinates(href),
             })
 
         return products
 
+    @staticmethod
+    def _card_text(a):
+        """Text of the feed card around anchor `a` (the anchor itself has none)."""
+        try:
+            return a.find_element(By.XPATH, "..").text
+        except (NoSuchElementException, StaleElementReferenceException):
+            return ""
+
+    def from_harvest(self, entries):
+        """Build the product list from anchors harvested by ScrollManager while scrolling."""
+        products = []
+        first_class = None
+        for i, entry in enumerate(entries):
+            if self.filter_by_first_class:
+                if i == 0:
+                    first_class = entry["cls"]
+                elif entry["cls"] != first_class:
+                    continue
+            products.append({
+                "name": entry["name"],
+                "class": entry["cls"],
+                "href": entry["href"],
+                "fingerprint": ChangeDetector.listing_fingerprint(entry["name"], entry.get("card", "")),
+                **self.coordinates(entry["href"]),
+            })
+        return products
+
     def save_to_json(self, data):
         os.makedirs(self.output_dir, exist_ok=True)
         with open(self.output_path, "w", encoding="utf-8") as f:
             json.dump(data, f, ensure_ascii=False, indent=2)
 
-    def run(self):
-        self.logger.info("[🔍] Extracting <a> tags with class and href...")
-        data = self.extract_links()
+    def run(self, harvested=None):
+        if harvested is not None:
+            self.logger.info("[🔍] Using links harvested during scrolling...")
+            data = self.from_harvest(harvested)
+        else:
+            self.logger.info("[🔍] Extracting <a> tags with class and href...")
+            data = self.extract_links()
         self.logger.info(f"[✅] Found {len(data)} matching links.")
         self.save_to_json(data)
         self.logger.info(f"[💾] Saved to {self.output_path}")
+        return data
@@ -0,0 +1,43 @@
+import time
+
+
+class ProgressTracker:
+    """Collects pipeline progress and forwards it to a callback as plain dicts.
+
+    Every event carries the current `stage`; during the place stage it also
+    carries done/total, places per second and the estimated time left.
+    """
+
+    def __init__(self, callback=None):
+        self.callback = callback
+        self.stage = None
+        self.total = 0
+        self.done = 0
+        self._started_at = None
+
+    def emit(self, stage, **fields):
+        self.stage = stage
+        if self.callback:
+            self.callback({"stage": stage, **fields})
+
+    def start_places(self, total):
+        self.total = total
+        self.done = 0
+        self._started_at = time.monotonic()
+        self.emit("places", **self.snapshot())
+
+    def place_done(self, **fields):
+        self.done += 1
+        self.emit("places", **self.snapshot(), **fields)
+
+    def snapshot(self):
+        elapsed = time.monotonic() - self._started_at if self._started_at else 0.0
+        rate = self.done / elapsed if elapsed > 0 else 0.0
+        remaining = max(self.total - self.done, 0)
+        eta = remaining / rate if rate > 0 else None
+        return {
+            "done": self.done,
+            "total": self.total,
+            "rate": rate,
+            "eta": eta,
+        }
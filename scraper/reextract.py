@@ -0,0 +1,115 @@
+"""Re-run the extraction logic over stored page snapshots, without a browser.
+
+    python -m scraper.reextract <key> [--workers N] [--store out/snapshots]
+
+Place pages are re-extracted in parallel across processes with the current
+ProductInfoScraper code; the latest feed snapshot (if any) is re-run through
+ProductExtractor. Results go to out/product_details_reextract_<key>.json
+(plus its normalized _cleaned version) and out/links_reextract_<key>.json.
+"""
+import argparse
+import json
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from config import settings
+from scraper.offline_dom import OfflineDriver
+from scraper.pacing import PacingController
+from scraper.product_info_scraper import ProductInfoScraper
+from scraper.product_normalizer import ProductNormalizer
+from scraper.products import ProductExtractor
+from scraper.snapshot_store import SnapshotStore
+
+logger = logging.getLogger("scraper.reextract")
+
+# État par processus, initialisé une seule fois par worker
+_store = None
+_scraper = None
+
+
+def _init_worker(store_root):
+    global _store, _scraper
+    _store = SnapshotStore(store_root)
+    _scraper = ProductInfoScraper(None, "reextract", logger, output_folder=store_root,
+                                  pacing=PacingController.offline(logger), links=[])
+    _scraper.poll_frequency = 0.001
+
+
+def _reextract_place(task):
+    url, page, fingerprint = task
+    pages = {kind: _store.load(sha) for kind, sha in page.items() if kind in ("place", "place_details")}
+    if "place" not in pages:
+        return None
+    _scraper._driver = OfflineDriver(url, pages)
+    # Même enregistrement qu'en direct : coordonnées, empreinte et complétude comprises
+    data = _scraper.new_record(url, page.get("name", ""), fingerprint)
+    try:
+        _scraper.wait_ready(_scraper.sections)
+        _scraper.extract_current(data, _scraper.sections)
+        _scraper._flag_completeness(data)
+        return data
+    except Exception as e:
+        # Même règle qu'en direct : une fiche sans contacts n'est pas gardée
+        logger.warning(f"Ré-extraction impossible pour {url} : {e}")
+        return None
+
+
+def reextract_links(store, key):
+    feeds = list(store.entries(key=key, kind="feed"))
+    if not feeds:
+        return None
+    latest = feeds[-1]
+    extractor = ProductExtractor(OfflineDriver(latest["url"], {"feed": store.load(latest["sha"])}, initial="feed"),
+                                 logger, filter_by_first_class=True)
+    extractor.wait_for_content = lambda: None
+    return extractor.extract_links()
+
+
+def reextract(key, store_root=None, workers=None):
+    store_root = str(store_root or settings.SNAPSHOT_DIR)
+    store = SnapshotStore(store_root, logger)
+    output_dir = settings.ensure_output_dir()
+
+    links = reextract_links(store, key)
+    if links is not None:
+        links_path = os.path.join(output_dir, f"links_reextract_{key}.json")
+        with open(links_path, "w", encoding="utf-8") as f:
+            json.dump(links, f, ensure_ascii=False, indent=2)
+        logger.info(f"{len(links)} liens ré-extraits → {links_path}")
+
+    # Empreintes des cartes du feed ré-extrait, comme en direct
+    fingerprints = {link["href"]: link.get("fingerprint") for link in links or ()}
+    pages = store.latest(key)
+    tasks = [(url, page, fingerprints.get(url)) for url, page in pages.items() if "place" in page]
+    logger.info(f"Ré-extraction de {len(tasks)} fiches ({workers or os.cpu_count()} processus)...")
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(store_root,)) as pool:
+        results = [r for r in pool.map(_reextract_place, tasks, chunksize=16) if r]
+
+    raw_path = os.path.join(output_dir, f"product_details_reextract_{key}.json")
+    with open(raw_path, "w", encoding="utf-8") as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+
+    ProductNormalizer(
+        input_path=raw_path,
+        output_path=os.path.join(output_dir, f"product_details_reextract_{key}_cleaned.json"),
+        logger=logger,
+    ).run()
+    logger.info(f"{len(results)}/{len(tasks)} fiches ré-extraites → {raw_path}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ré-extraction hors ligne depuis les snapshots.")
+    parser.add_argument("key", help="clé du job (ex: traiteur)")
+    parser.add_argument("--workers", type=int, default=None, help="nombre de processus")
+    parser.add_argument("--store", default=None, help="dossier des snapshots")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    reextract(args.key, args.store, args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+import json
+import os
+import time
+import logging
+
+from selenium.common.exceptions import TimeoutException, StaleElementReferenceException
+
+TIMEOUT = "timeout"
+STALE_ELEMENT = "stale_element"
+MISSING_FIELD = "missing_field"
+THROTTLING = "throttling"
+NAVIGATION = "navigation"
+
+# Classe d'échec -> (backoff de base en secondes, nombre max de tentatives)
+RETRY_POLICIES = {
+    TIMEOUT: (30, 3),
+    STALE_ELEMENT: (5, 3),
+    MISSING_FIELD: (60, 2),
+    THROTTLING: (300, 4),
+    NAVIGATION: (15, 3),
+}
+
+
+def classify(error) -> str:
+    """Failure class of an exception raised while scraping a place."""
+    if isinstance(error, TimeoutException):
+        return TIMEOUT
+    if isinstance(error, StaleElementReferenceException):
+        return STALE_ELEMENT
+    # net::ERR_* au chargement, session perdue, fiche introuvable...
+    return NAVIGATION
+
+
+class RetryQueue:
+    """Persistent per-key queue of places to scrape again, with per-class backoff.
+
+    Each entry remembers its link, failure class, attempt count and the
+    sections still to scrape. The delay doubles with every attempt, and an
+    entry that exhausts its class's attempts moves to `dead`.
+    """
+
+    def __init__(self, key, logger: logging.Logger = None, output_folder="out"):
+        self.logger = logger
+        self.path = os.path.join(output_folder, f"retry_{key}.json")
+        self.pending, self.dead = self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return {}, {}
+        with open(self.path, encoding="utf-8") as f:
+            try:
+                data = json.load(f)
+            except json.JSONDecodeError:
+                return {}, {}
+        return data.get("pending", {}), data.get("dead", {})
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump({"pending": self.pending, "dead": self.dead}, f, ensure_ascii=False, indent=2)
+
+    def push(self, link, failure, sections, error=""):
+        """Schedule `link` again; returns False once its attempts are exhausted."""
+        href = link["href"]
+        previous = self.pending.get(href, {})
+        attempts = previous.get("attempts", 0) + 1
+        base_delay, max_attempts = RETRY_POLICIES[failure]
+        entry = {
+            "link": link,
+            "failure": failure,
+            "sections": list(sections),
+            "attempts": attempts,
+            "error": str(error)[:300],
+        }
+        if attempts > max_attempts:
+            self.pending.pop(href, None)
+            self.dead[href] = entry
+            self._save()
+            if self.logger:
+                self.logger.warning(f" Abandon après {attempts - 1} tentatives ({failure}) : {href}")
+            return False
+
+        entry["not_before"] = time.time() + base_delay * 2 ** (attempts - 1)
+        self.pending[href] = entry
+        self._save()
+        if self.logger:
+            self.logger.info(f" Réessai #{attempts} prévu ({failure}) : {href}")
+        return True
+
+    def resolve(self, href):
+        if self.pending.pop(href, None) is not None:
+            self._save()
+
+    def due(self, now=None):
+        now = now or time.time()
+        return [e for e in self.pending.values() if e["not_before"] <= now]
+
+    def next_due(self):
+        return min((e["not_before"] for e in self.pending.values()), default=None)
+
+    def __len__(self):
+        return len(self.pending)
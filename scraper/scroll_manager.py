@@ -1,58 +1,103 @@
 import time, math
-from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, JavascriptException
+from selenium.common.exceptions import TimeoutException
 from config import settings
 import logging
 
+FEED_SELECTOR = "div[role='feed'][aria-label*='Résultats']"
+
+# Scrolls the feed's container (first scrollable ancestor, max 3 levels) by
+# `step` px and returns its scrollHeight; step 0 only measures.
+SCROLL_FEED_JS = """
+let el = document.querySelector(arguments[0]);
+for (let i = 0; i < 3 && el && el.scrollHeight <= el.clientHeight; i++) { el = el.parentElement; }
+if (!el) { return 0; }
+if (arguments[1]) { el.scrollBy(0, arguments[1]); }
+return el.scrollHeight;
+"""
+
+# Harvests not-yet-seen place anchors of the feed, then detaches all but the
+# last `keep` entries and grows a spacer by their height so that scrollHeight
+# (and Maps' "load more" trigger at the bottom) is unchanged.
+HARVEST_AND_PRUNE_JS = """
+const feed = document.querySelector(arguments[0]), keep = arguments[1], prune = arguments[2];
+const out = [];
+for (const a of feed.querySelectorAll('a[href*="/maps/place/"]:not([data-insea-harvested])')) {
+    a.setAttribute('data-insea-harvested', '1');
+    out.push({
+        name: a.getAttribute('aria-label') || '',
+        card: (a.parentElement && a.parentElement.innerText) || '',
+        cls: a.getAttribute('class') || '',
+        href: a.href
+    });
+}
+if (!prune) { return out; }
+let spacer = feed.querySelector(':scope > [data-insea-spacer]');
+if (!spacer) {
+    spacer = document.createElement('div');
+    spacer.setAttribute('data-insea-spacer', '1');
+    spacer.style.height = '0px';
+    feed.insertBefore(spacer, feed.firstChild);
+}
+const entries = Array.from(feed.children).filter(c => c !== spacer);
+let removed = 0;
+for (const c of entries.slice(0, Math.max(0, entries.length - keep))) {
+    if (c.querySelector('a[href*="/maps/place/"]:not([data-insea-harvested])')) { break; }
+    removed += c.offsetHeight;
+    c.remove();
+}
+spacer.style.height = (parseFloat(spacer.style.height) + removed) + 'px';
+return out;
+"""
+
 class ScrollManager:
-    def __init__(self, driver, logger):
+    """Scrolls the results feed until Maps stops adding places.
+
+    The feed is only reached through `driver.execute_script` with JSON
+    arguments, so the same loop drives a Selenium session or a CDP page
+    (`cdp_driver.BlockingPage`). With `prune`, or `collect`, place anchors are
+    harvested while scrolling; `prune` also detaches the harvested entries.
+    """
+
+    def __init__(self, driver, logger, progress=None, stop_event=None, pacing=None, prune=False,
+                 collect=False):
         self.driver = driver
         self.logger = logger
-        self._container = None
+        self.pacing = pacing
+        self.progress = progress
+        self.stop_event = stop_event
+        self.prune = prune
+        self.collect = collect or prune
+        self._harvested = {}  # href -> entry, dans l'ordre d'apparition
 
     # ---------- helpers -------------------------------------------------
-    def _find_scrollable_parent(self, element):
-        """Walk up the tree until scrollHeight > clientHeight."""
-        for _ in range(3):  # max 3 levels
-            try:
-                is_scrollable = self.driver.execute_script(
-                    "return arguments[0].scrollHeight > arguments[0].clientHeight",
-                    element
-                )
-                if is_scrollable:
-                    return element
-                element = element.find_element(By.XPATH, "..")
-            except JavascriptException:
-                break
-        return element  # fallback
-
-    def _get_metrics(self, el):
-        return self.driver.execute_script(
-            "return {sh: arguments[0].scrollHeight, st: arguments[0].scrollTop, ch: arguments[0].clientHeight}",
-            el
-        )
+    def _scroll(self, step):
+        return self.driver.execute_script(SCROLL_FEED_JS, FEED_SELECTOR, step)
 
     # ---------- public API ----------------------------------------------
-    def locate_scroll_container(self):
-        """Find (and cache) the real scrollable container."""
-        if self._container is None:
-            try:
-                feed = WebDriverWait(self.driver, 20).until(
-                    EC.presence_of_element_located((
-                        By.XPATH,
-                        "//div[@role='feed' and contains(@aria-label, 'Résultats')]"
-                    ))
-                )
-                self._container = self._find_scrollable_parent(feed)
-                self.logger.info("Scroll container located: %s", self._container.get_attribute("class"))
-            except TimeoutException as e:
-                raise RuntimeError("Scroll container not found") from e
-        return self._container
+    def wait_for_feed(self, timeout=20):
+        try:
+            WebDriverWait(self.driver, timeout).until(
+                lambda d: d.execute_script("return !!document.querySelector(arguments[0])", FEED_SELECTOR)
+            )
+        except TimeoutException as e:
+            raise RuntimeError("Scroll container not found") from e
+        self.logger.info("Scroll container located (scrollHeight=%d).", self._scroll(0))
+
+    def harvest(self):
+        """Collect new place anchors from the feed and, with `prune`, detach harvested entries."""
+        entries = self.driver.execute_script(
+            HARVEST_AND_PRUNE_JS, FEED_SELECTOR, settings.PRUNE_KEEP_LAST, self.prune
+        )
+        for entry in entries:
+            self._harvested.setdefault(entry["href"], entry)
+        return len(entries)
+
+    def harvested_links(self):
+        return list(self._harvested.values())
 
     def scroll_to_end(self):
-        container = self.locate_scroll_container()
+        self.wait_for_feed()
 
         last_sh = 0
         loops = 0
@@ -60,29 +105,39 @@ class ScrollManager:
         max_stale = 4
 
         while loops < settings.MAX_SCROLL_LOOPS and stale_count < max_stale:
+            if self.stop_event and self.stop_event.is_set():
+                self.logger.info("Scrolling cancelled after %d loop(s).", loops)
+                return
+
             # scroll
-            self.driver.execute_script(
-                "arguments[0].scrollBy(0, arguments[1]);",
-                container,
-                settings.SCROLL_INCREMENT
-            )
+            self._scroll(settings.SCROLL_INCREMENT)
             loops += 1
 
             # Wait until height increases OR timeout
-            for _ in range(int(3 / settings.SCROLL_PAUSE_SEC)):
-                time.sleep(settings.SCROLL_PAUSE_SEC)
-                metrics = self._get_metrics(container)
-                if metrics["sh"] > last_sh:
+            pause = settings.SCROLL_PAUSE_SEC * (self.pacing.wait_scale if self.pacing else 1.0)
+            pause = max(pause, 0.05)
+            for _ in range(max(1, int(3 / pause))):
+                time.sleep(pause)
+                sh = self._scroll(0)
+                if sh > last_sh:
                     stale_count = 0
                     break
             else:
                 stale_count += 1
                 self.logger.debug("Height unchanged for %d cycle(s).", stale_count)
 
-            last_sh = metrics["sh"]
+            last_sh = sh
             self.logger.info("Loop %d: scrollHeight=%d", loops, last_sh)
+            if self.collect:
+                self.harvest()
+                self.logger.debug("Harvested %d place link(s) so far.", len(self._harvested))
+            if self.progress:
+                self.progress.emit("scroll", loop=loops, max_loops=settings.MAX_SCROLL_LOOPS)
+
+        if self.collect:
+            self.harvest()
 
         if stale_count >= max_stale:
             self.logger.info("Scrolling appears finished (no new content).")
         else:
-            self.logger.info("Reached max loops (%d).", settings.MAX_SCROLL_LOOPS)
\ No newline at end of file
+            self.logger.info("Reached max loops (%d).", settings.MAX_SCROLL_LOOPS)
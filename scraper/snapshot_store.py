@@ -0,0 +1,77 @@
+import gzip
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+
+
+class SnapshotStore:
+    """Content-addressed, gzip-compressed store of raw page DOMs.
+
+    Objects live under `objects/<2 hex>/<sha256>.html.gz`, so identical pages
+    are stored once. `index.jsonl` records one line per capture with the URL,
+    kind ("feed", "place", "place_details"), key, place name and timestamp.
+    """
+
+    def __init__(self, root, logger=None):
+        self.root = str(root)
+        self.logger = logger
+        self.index_path = os.path.join(self.root, "index.jsonl")
+        self._lock = threading.Lock()
+        os.makedirs(os.path.join(self.root, "objects"), exist_ok=True)
+
+    def _object_path(self, digest):
+        return os.path.join(self.root, "objects", digest[:2], f"{digest}.html.gz")
+
+    def save(self, url, html, kind, key=None, name=""):
+        raw = html.encode("utf-8")
+        digest = hashlib.sha256(raw).hexdigest()
+        path = self._object_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with gzip.open(tmp_path, "wb", compresslevel=6) as f:
+                f.write(raw)
+            os.replace(tmp_path, path)
+
+        entry = {
+            "url": url,
+            "sha": digest,
+            "kind": kind,
+            "key": key,
+            "name": name,
+            "ts": datetime.now().isoformat(timespec="seconds"),
+        }
+        with self._lock, open(self.index_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        return digest
+
+    def load(self, digest):
+        with gzip.open(self._object_path(digest), "rb") as f:
+            return f.read().decode("utf-8")
+
+    def entries(self, key=None, kind=None):
+        if not os.path.exists(self.index_path):
+            return
+        with open(self.index_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # ligne tronquée par un arrêt brutal
+                if key is not None and entry.get("key") != key:
+                    continue
+                if kind is not None and entry.get("kind") != kind:
+                    continue
+                yield entry
+
+    def latest(self, key):
+        """Latest capture per URL for `key`: {url: {"name": ..., kind: sha, ...}}."""
+        pages = {}
+        for entry in self.entries(key=key):
+            page = pages.setdefault(entry["url"], {"name": entry.get("name", "")})
+            page[entry["kind"]] = entry["sha"]
+            if entry.get("name"):
+                page["name"] = entry["name"]
+        return pages
@@ -0,0 +1,117 @@
+"""Grid index over place coordinates for radius and k-nearest queries.
+
+Places are bucketed into square cells of `cell_deg` degrees, stored sorted by
+cell so that each cell is one contiguous slice of the coordinate arrays. A
+query only computes (vectorized haversine) distances for the points in the
+cells its search circle overlaps.
+"""
+import json
+import logging
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEG_LAT = np.pi * EARTH_RADIUS_KM / 180
+HALF_CIRCUMFERENCE_KM = np.pi * EARTH_RADIUS_KM
+
+# Au-delà, parcourir les cellules coûte plus cher qu'un calcul sur tous les points
+MAX_CELLS_PER_QUERY = 4096
+
+
+def haversine_km(lat, lng, lats, lngs):
+    """Distances in km from (lat, lng) to each point of the `lats`/`lngs` arrays."""
+    lat, lng = np.radians(lat), np.radians(lng)
+    lats, lngs = np.radians(lats), np.radians(lngs)
+    a = np.sin((lats - lat) / 2) ** 2 + np.cos(lat) * np.cos(lats) * np.sin((lngs - lng) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+class SpatialIndex:
+    """Immutable index of place records that carry "lat"/"lng" keys."""
+
+    def __init__(self, records, cell_deg=0.05, logger: logging.Logger = None):
+        self.cell_deg = cell_deg
+        located = [r for r in records
+                   if isinstance(r.get("lat"), (int, float)) and isinstance(r.get("lng"), (int, float))]
+        if logger and len(located) < len(records):
+            logger.info(f"{len(records) - len(located)} fiches sans coordonnées ignorées.")
+
+        lats = np.fromiter((r["lat"] for r in located), dtype=np.float64, count=len(located))
+        lngs = np.fromiter((r["lng"] for r in located), dtype=np.float64, count=len(located))
+        cells = self._cell_keys(*self._cells(lats, lngs))
+        order = np.argsort(cells, kind="stable")
+
+        self.records = [located[i] for i in order]
+        self.lats = lats[order]
+        self.lngs = lngs[order]
+        self.cells = cells[order]
+
+    @classmethod
+    def from_file(cls, path, **kwargs):
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f), **kwargs)
+
+    def __len__(self):
+        return len(self.records)
+
+    # ---------- grille ------------------------------------------------------
+    def _cells(self, lats, lngs):
+        return (np.floor((np.asarray(lats) + 90) / self.cell_deg).astype(np.int64),
+                np.floor((np.asarray(lngs) + 180) / self.cell_deg).astype(np.int64))
+
+    @staticmethod
+    def _cell_keys(rows, cols):
+        return rows * 1_000_000 + cols
+
+    def _candidates(self, lat, lng, radius_km):
+        """Positions of the points in the cells overlapped by the search circle."""
+        dlat = radius_km / KM_PER_DEG_LAT
+        dlng = dlat / max(np.cos(np.radians(lat)), 1e-6)
+        if lat - dlat < -90 or lat + dlat > 90 or lng - dlng < -180 or lng + dlng > 180:
+            return None  # pôle ou antiméridien : pas de rectangle simple
+
+        (r0, r1), (c0, c1) = self._cells([lat - dlat, lat + dlat], [lng - dlng, lng + dlng])
+        if (r1 - r0 + 1) * (c1 - c0 + 1) > MAX_CELLS_PER_QUERY:
+            return None
+
+        rows, cols = np.meshgrid(np.arange(r0, r1 + 1), np.arange(c0, c1 + 1), indexing="ij")
+        keys = self._cell_keys(rows.ravel(), cols.ravel())
+        starts = np.searchsorted(self.cells, keys, side="left")
+        ends = np.searchsorted(self.cells, keys, side="right")
+        hit = ends > starts
+        if not hit.any():
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate([np.arange(s, e) for s, e in zip(starts[hit], ends[hit])])
+
+    # ---------- requêtes ----------------------------------------------------
+    def _within(self, lat, lng, radius_km):
+        """(positions, distances) of the points within `radius_km`, nearest first."""
+        candidates = self._candidates(lat, lng, radius_km)
+        if candidates is None:
+            candidates = np.arange(len(self.records))
+        distances = haversine_km(lat, lng, self.lats[candidates], self.lngs[candidates])
+        inside = distances <= radius_km
+        candidates, distances = candidates[inside], distances[inside]
+        order = np.argsort(distances, kind="stable")
+        return candidates[order], distances[order]
+
+    def _results(self, positions, distances):
+        return [dict(self.records[p], distance_km=round(float(d), 3)) for p, d in zip(positions, distances)]
+
+    def within(self, lat, lng, radius_km, limit=None):
+        """Records within `radius_km` of (lat, lng), nearest first, with a distance_km key."""
+        positions, distances = self._within(lat, lng, radius_km)
+        return self._results(positions[:limit], distances[:limit])
+
+    def nearest(self, lat, lng, k=10, max_radius_km=None):
+        """The `k` records nearest to (lat, lng), optionally no further than `max_radius_km`."""
+        if not len(self.records) or k <= 0:
+            return []
+        limit = min(max_radius_km or HALF_CIRCUMFERENCE_KM, HALF_CIRCUMFERENCE_KM)
+        # Rayon doublé jusqu'à trouver k points : tout point hors du cercle est plus loin
+        radius = min(self.cell_deg * KM_PER_DEG_LAT, limit)
+        while True:
+            positions, distances = self._within(lat, lng, radius)
+            if len(positions) >= k or radius >= limit:
+                return self._results(positions[:k], distances[:k])
+            radius = min(radius * 2, limit)
@@ -0,0 +1,209 @@
+import json
+import os
+import sqlite3
+import time
+from dataclasses import dataclass
+from urllib.parse import urlparse
+
+
+@dataclass
+class Lease:
+    item_id: int
+    job: str
+    kind: str
+    payload: dict
+    attempts: int
+
+
+class WorkQueue:
+    """Job queue with lease / heartbeat / ack semantics.
+
+    A leased item is invisible to other workers until its lease expires; a
+    worker that crashes simply stops heartbeating and the item is handed out
+    again. Backends register themselves in QUEUE_BACKENDS by URL scheme.
+    """
+
+    def put(self, job, kind, payloads):
+        raise NotImplementedError
+
+    def lease(self, job, worker_id, lease_sec):
+        raise NotImplementedError
+
+    def heartbeat(self, lease, worker_id, lease_sec):
+        raise NotImplementedError
+
+    def ack(self, lease, worker_id):
+        raise NotImplementedError
+
+    def nack(self, lease, worker_id, error="", delay=0.0):
+        raise NotImplementedError
+
+    def stats(self, job):
+        raise NotImplementedError
+
+
+class ResultStore:
+    """Shared store of place records, keyed by job and URL (last write wins)."""
+
+    def save(self, job, record):
+        raise NotImplementedError
+
+    def records(self, job):
+        raise NotImplementedError
+
+
+def _connect(path):
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA busy_timeout=30000")
+    return conn
+
+
+class SQLiteWorkQueue(WorkQueue):
+    """Local backend: one SQLite file shared by every worker process on the host."""
+
+    def __init__(self, path, max_attempts=5):
+        self.path = path
+        self.max_attempts = max_attempts
+        self.conn = _connect(path)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS queue (
+                id          INTEGER PRIMARY KEY,
+                job         TEXT NOT NULL,
+                kind        TEXT NOT NULL,
+                item_key    TEXT NOT NULL,
+                payload     TEXT NOT NULL,
+                status      TEXT NOT NULL DEFAULT 'pending',
+                attempts    INTEGER NOT NULL DEFAULT 0,
+                worker      TEXT,
+                lease_until REAL,
+                not_before  REAL NOT NULL DEFAULT 0,
+                error       TEXT,
+                UNIQUE (job, kind, item_key)
+            );
+            CREATE INDEX IF NOT EXISTS queue_ready ON queue (job, status, not_before);
+        """)
+
+    @staticmethod
+    def _item_key(kind, payload):
+        if kind == "place":
+            return payload["href"]
+        return json.dumps(payload, sort_keys=True)
+
+    def put(self, job, kind, payloads):
+        """Enqueue payloads; items already known for this job are left untouched."""
+        rows = [(job, kind, self._item_key(kind, p), json.dumps(p, ensure_ascii=False)) for p in payloads]
+        with self.conn:
+            cur = self.conn.executemany(
+                "INSERT OR IGNORE INTO queue (job, kind, item_key, payload) VALUES (?, ?, ?, ?)", rows
+            )
+        return cur.rowcount
+
+    def lease(self, job, worker_id, lease_sec):
+        now = time.time()
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = self.conn.execute(
+                """SELECT id, kind, payload, attempts FROM queue
+                   WHERE job = ? AND not_before <= ?
+                     AND (status = 'pending' OR (status = 'leased' AND lease_until < ?))
+                   ORDER BY kind = 'place', id LIMIT 1""",
+                (job, now, now),
+            ).fetchone()
+            if row is None:
+                self.conn.execute("COMMIT")
+                return None
+            item_id, kind, payload, attempts = row
+            self.conn.execute(
+                "UPDATE queue SET status = 'leased', worker = ?, lease_until = ?, attempts = attempts + 1 WHERE id = ?",
+                (worker_id, now + lease_sec, item_id),
+            )
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        return Lease(item_id, job, kind, json.loads(payload), attempts + 1)
+
+    def heartbeat(self, lease, worker_id, lease_sec):
+        """Extend the lease; False means it was lost (expired and taken by someone else)."""
+        with self.conn:
+            cur = self.conn.execute(
+                "UPDATE queue SET lease_until = ? WHERE id = ? AND worker = ? AND status = 'leased'",
+                (time.time() + lease_sec, lease.item_id, worker_id),
+            )
+        return cur.rowcount == 1
+
+    def ack(self, lease, worker_id):
+        with self.conn:
+            self.conn.execute(
+                "UPDATE queue SET status = 'done', lease_until = NULL, error = NULL WHERE id = ? AND worker = ?",
+                (lease.item_id, worker_id),
+            )
+
+    def nack(self, lease, worker_id, error="", delay=0.0):
+        """Release the item for another attempt after `delay`, or mark it failed."""
+        status = "failed" if lease.attempts >= self.max_attempts else "pending"
+        with self.conn:
+            self.conn.execute(
+                """UPDATE queue SET status = ?, lease_until = NULL, not_before = ?, error = ?
+                   WHERE id = ? AND worker = ?""",
+                (status, time.time() + delay, error[:500], lease.item_id, worker_id),
+            )
+
+    def stats(self, job):
+        rows = self.conn.execute(
+            "SELECT kind, status, COUNT(*) FROM queue WHERE job = ? GROUP BY kind, status", (job,)
+        ).fetchall()
+        stats = {}
+        for kind, status, count in rows:
+            stats.setdefault(kind, {})[status] = count
+        return stats
+
+
+class SQLiteResultStore(ResultStore):
+    def __init__(self, path):
+        self.conn = _connect(path)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS results (
+                job     TEXT NOT NULL,
+                url     TEXT NOT NULL,
+                record  TEXT NOT NULL,
+                updated REAL NOT NULL,
+                PRIMARY KEY (job, url)
+            )
+        """)
+
+    def save(self, job, record):
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO results (job, url, record, updated) VALUES (?, ?, ?, ?)",
+                (job, record["url"], json.dumps(record, ensure_ascii=False), time.time()),
+            )
+
+    def records(self, job):
+        rows = self.conn.execute("SELECT record FROM results WHERE job = ? ORDER BY updated", (job,))
+        return [json.loads(r[0]) for r in rows]
+
+
+# Un broker réseau s'enregistre ici avec son schéma d'URL (ex: "redis")
+QUEUE_BACKENDS = {"sqlite": (SQLiteWorkQueue, SQLiteResultStore)}
+
+
+def register_backend(scheme, queue_cls, result_store_cls):
+    QUEUE_BACKENDS[scheme] = (queue_cls, result_store_cls)
+
+
+def open_backend(url):
+    """Return (WorkQueue, ResultStore) for a URL like sqlite:///out/queue.db."""
+    parsed = urlparse(url)
+    if parsed.scheme not in QUEUE_BACKENDS:
+        raise ValueError(f"Backend de file inconnu : {parsed.scheme!r}")
+    queue_cls, result_store_cls = QUEUE_BACKENDS[parsed.scheme]
+    if parsed.scheme == "sqlite":
+        path = parsed.netloc + parsed.path
+        # sqlite:///relatif.db, sqlite:////absolu.db (comme SQLAlchemy)
+        path = path[1:] if path.startswith("/") else path
+        return queue_cls(path), result_store_cls(path)
+    return queue_cls(url), result_store_cls(url)
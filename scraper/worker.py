@@ -0,0 +1,226 @@
+"""Queue-driven scraping worker; run as many as you like, on one host or several.
+
+    python -m scraper.worker enqueue-places <job> [--products out/products_....json]
+    python -m scraper.worker enqueue-tiles  <job> --bbox LAT1 LNG1 LAT2 LNG2 [--step 0.05] [--zoom 14]
+    python -m scraper.worker work   <job> [--worker-id ID] [--exit-when-empty] [--fields phone rating ...]
+    python -m scraper.worker stats  <job>
+    python -m scraper.worker export <job>
+    python -m scraper.worker retry  <job> [--incomplete] [--max-wait SEC] [--fields ...]
+
+Every command takes --queue (default settings.QUEUE_URL). Workers lease one
+item at a time and heartbeat while working on it; an item whose worker dies
+is leased again once its lease expires. Results go to the shared result
+store; `export` writes them to out/product_details_live_<job>.json so the
+usual normalizer can run.
+
+`retry` is a separate, local worker: it drains out/retry_<job>.json (places
+that failed or came back incomplete, see scraper/retry_queue.py), re-scraping
+only the missing sections and merging them into out/product_details_live_<job>.json.
+With --incomplete it first queues every saved record flagged incomplete.
+"""
+import argparse
+import json
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+
+from config import settings
+from scraper.work_queue import open_backend
+
+logger = logging.getLogger("scraper.worker")
+
+
+class Heartbeat(threading.Thread):
+    """Keeps a lease alive while the item is being processed."""
+
+    def __init__(self, queue_url, lease, worker_id):
+        super().__init__(daemon=True)
+        self.queue_url = queue_url
+        self.lease = lease
+        self.worker_id = worker_id
+        self.lost = False
+        self._done = threading.Event()
+
+    def run(self):
+        # Connexion dédiée : une connexion sqlite3 ne se partage pas entre threads
+        queue, _ = open_backend(self.queue_url)
+        while not self._done.wait(settings.QUEUE_HEARTBEAT_SEC):
+            if not queue.heartbeat(self.lease, self.worker_id, settings.QUEUE_LEASE_SEC):
+                self.lost = True
+                logger.warning(f"Lease perdu pour l'élément {self.lease.item_id}")
+                return
+
+    def stop(self):
+        self._done.set()
+        self.join()
+
+
+class QueueWorker:
+    def __init__(self, queue_url, job, worker_id=None, fields=None):
+        from scraper.driver_watchdog import DriverWatchdog
+        from scraper.pacing import PacingController
+        from scraper.product_info_scraper import ProductInfoScraper
+
+        self.queue_url = queue_url
+        self.job = job
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self.queue, self.result_store = open_backend(queue_url)
+        self.pacing = PacingController(logger)
+        self.watchdog = DriverWatchdog(logger)
+        self.info_scraper = ProductInfoScraper(
+            None, job, logger, links=[], pacing=self.pacing,
+            watchdog=self.watchdog, result_store=self.result_store,
+            output_folder=str(settings.ensure_output_dir()), fields=fields,
+        )
+
+    def process_place(self, payload):
+        """Scrape one place; True if a record reached the result store."""
+        # Le store partagé garde les fiches : rien ne s'accumule d'un élément à l'autre
+        self.info_scraper.links = [payload]
+        self.info_scraper.results = []
+        self.info_scraper._index = {}
+        self.info_scraper._scrape_link(1, payload)
+        return payload["href"] in self.info_scraper._index
+
+    def process_tile(self, payload):
+        """Search one map tile and enqueue the places it lists."""
+        from scraper.scroll_manager import ScrollManager
+        from scraper.products import ProductExtractor
+
+        driver = self.watchdog.driver
+        driver.get(settings.get_tile_search_url(self.job, payload["lat"], payload["lng"], payload["zoom"]))
+        ScrollManager(driver, logger, pacing=self.pacing).scroll_to_end()
+        links = ProductExtractor(driver, logger, filter_by_first_class=True).extract_links()
+        added = self.queue.put(self.job, "place", links)
+        logger.info(f"Tuile {payload}: {len(links)} lieux, {added} nouveaux")
+        return True
+
+    def _outstanding(self):
+        """Items of the job that are neither done nor failed (pending or leased)."""
+        return sum(count for by_status in self.queue.stats(self.job).values()
+                   for status, count in by_status.items() if status in ("pending", "leased"))
+
+    def run(self, exit_when_empty=False):
+        logger.info(f"Worker {self.worker_id} démarré sur '{self.job}'")
+        try:
+            while True:
+                lease = self.queue.lease(self.job, self.worker_id, settings.QUEUE_LEASE_SEC)
+                if lease is None:
+                    # Un élément encore tenu par un autre worker peut revenir si celui-ci meurt
+                    if exit_when_empty and not self._outstanding():
+                        break
+                    time.sleep(settings.QUEUE_POLL_SEC)
+                    continue
+
+                heartbeat = Heartbeat(self.queue_url, lease, self.worker_id)
+                heartbeat.start()
+                try:
+                    if lease.kind == "tile":
+                        ok = self.process_tile(lease.payload)
+                    else:
+                        ok = self.process_place(lease.payload)
+                    error = "" if ok else "aucune donnée extraite"
+                except Exception as e:
+                    ok, error = False, str(e)
+                    logger.error(f"Échec de l'élément {lease.item_id} : {e}")
+                finally:
+                    heartbeat.stop()
+
+                if heartbeat.lost:
+                    continue  # un autre worker a repris l'élément
+                if ok:
+                    self.queue.ack(lease, self.worker_id)
+                else:
+                    self.queue.nack(lease, self.worker_id, error, delay=settings.QUEUE_RETRY_DELAY_SEC)
+        finally:
+            self.watchdog.quit()
+        logger.info(f"Worker {self.worker_id} terminé")
+
+
+def retry_failed(job, incomplete=False, max_wait=None, fields=None):
+    from scraper.driver_watchdog import DriverWatchdog
+    from scraper.pacing import PacingController
+    from scraper.product_info_scraper import ProductInfoScraper
+    from scraper.retry_queue import RetryQueue
+
+    output_folder = str(settings.ensure_output_dir())
+    retries = RetryQueue(job, logger, output_folder)
+    watchdog = DriverWatchdog(logger)
+    info_scraper = ProductInfoScraper(
+        None, job, logger, links=[], pacing=PacingController(logger), watchdog=watchdog,
+        retry_queue=retries, input_folder=output_folder, output_folder=output_folder,
+        fields=fields, resume=True,
+    )
+    try:
+        if incomplete:
+            logger.info(f"{info_scraper.enqueue_incomplete()} fiches incomplètes ajoutées")
+        info_scraper.drain_retries(max_wait)
+    finally:
+        watchdog.quit()
+    logger.info(f"Réessais : {len(retries)} en attente, {len(retries.dead)} abandonnés")
+
+
+def tiles(lat1, lng1, lat2, lng2, step, zoom):
+    lat = min(lat1, lat2)
+    while lat <= max(lat1, lat2):
+        lng = min(lng1, lng2)
+        while lng <= max(lng1, lng2):
+            yield {"lat": round(lat, 6), "lng": round(lng, 6), "zoom": zoom}
+            lng += step
+        lat += step
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Worker de scraping sur file partagée.")
+    parser.add_argument("command", choices=["enqueue-places", "enqueue-tiles", "work", "stats", "export", "retry"])
+    parser.add_argument("job")
+    parser.add_argument("--queue", default=settings.QUEUE_URL)
+    parser.add_argument("--products", help="fichier products_*.json (défaut : le plus récent)")
+    parser.add_argument("--bbox", type=float, nargs=4, metavar=("LAT1", "LNG1", "LAT2", "LNG2"))
+    parser.add_argument("--step", type=float, default=0.05)
+    parser.add_argument("--zoom", type=int, default=14)
+    parser.add_argument("--worker-id")
+    parser.add_argument("--exit-when-empty", action="store_true")
+    parser.add_argument("--incomplete", action="store_true", help="retry: ajoute les fiches incomplètes")
+    parser.add_argument("--max-wait", type=float, help="retry: attente max des backoffs (s)")
+    parser.add_argument("--fields", nargs="+", help="work/retry: champs à extraire (défaut : tous)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(process)d %(levelname)s %(message)s")
+
+    if args.command == "work":
+        QueueWorker(args.queue, args.job, args.worker_id, args.fields).run(args.exit_when_empty)
+        return
+    if args.command == "retry":
+        retry_failed(args.job, args.incomplete, args.max_wait, args.fields)
+        return
+
+    queue, result_store = open_backend(args.queue)
+    if args.command == "enqueue-places":
+        if args.products:
+            with open(args.products, encoding="utf-8") as f:
+                links = [item for item in json.load(f) if "href" in item and "name" in item]
+        else:
+            from scraper.product_info_scraper import load_latest_links
+            links = load_latest_links(str(settings.ensure_output_dir()), logger)
+        logger.info(f"{queue.put(args.job, 'place', links)} lieux ajoutés à '{args.job}'")
+    elif args.command == "enqueue-tiles":
+        if not args.bbox:
+            parser.error("--bbox est requis pour enqueue-tiles")
+        added = queue.put(args.job, "tile", list(tiles(*args.bbox, args.step, args.zoom)))
+        logger.info(f"{added} tuiles ajoutées à '{args.job}'")
+    elif args.command == "stats":
+        print(json.dumps(queue.stats(args.job), indent=2))
+    elif args.command == "export":
+        records = result_store.records(args.job)
+        path = os.path.join(settings.ensure_output_dir(), f"product_details_live_{args.job}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(records, f, ensure_ascii=False, indent=2)
+        logger.info(f"{len(records)} fiches exportées → {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""Shared test doubles: a stored place page, and a driver and watchdog over it."""
+import logging
+
+import pytest
+from selenium.common.exceptions import WebDriverException
+
+from scraper.offline_dom import OfflineDriver
+
+PLACE_URL = "https://www.google.com/maps/place/Cafe/data=!3d33.5731!4d-7.5898"
+
+PLACE_HTML = """<html><body><h1>Café</h1>
+<div class="fontBodyMedium"><span>4,5</span><span>★</span><span>(12)</span></div>
+<button data-item-id="address"><div class="fontBodyMedium">1 rue des Écoles</div></button>
+{extra}
+</body></html>"""
+
+
+class FakeDriver(OfflineDriver):
+    """OfflineDriver that renders the same page for every URL, with the window API
+    the tab mode drives. Once `dead`, navigation and window calls fail."""
+
+    def __init__(self, html, url=PLACE_URL):
+        super().__init__(url, {"place": html})
+        self.handles = ["tab-0"]
+        self.current_window_handle = "tab-0"
+        self.loads = 0
+        self.dead = False
+        self.switch_to = self
+
+    def _check(self):
+        if self.dead:
+            raise WebDriverException("session morte")
+
+    def get(self, url):
+        self._check()
+        self.loads += 1
+        self.current_url = url
+
+    def window(self, handle):
+        self._check()
+        self.current_window_handle = handle
+
+    def new_window(self, kind):
+        self._check()
+        self.current_window_handle = f"tab-{len(self.handles)}"
+        self.handles.append(self.current_window_handle)
+
+    def execute_script(self, script, *args):
+        self._check()
+        self.loads += 1
+
+    def close(self):
+        pass
+
+
+class FakeWatchdog:
+    """DriverWatchdog stand-in. With `recycle_after`, asks for a recycle once that
+    many pages are done, or after a reported failure; each recycle records how many
+    loads were still in flight and starts a fresh FakeDriver."""
+
+    def __init__(self, driver, recycle_after=None):
+        self.driver = driver
+        self.recycle_after = recycle_after
+        self.pages = 0
+        self.failures = []
+        self.recycled = []
+        self._suspect = False
+
+    def recycle_reason(self):
+        if self._suspect:
+            self._suspect = False
+            if self.driver.dead:
+                return "session morte"
+        if self.recycle_after is not None and self.pages >= self.recycle_after and not self.recycled:
+            return "pages"
+        return None
+
+    def recycle(self, reason):
+        self.recycled.append(self.driver.loads - self.pages)
+        self.driver = FakeDriver(self.driver._pages["place"], self.driver.current_url)
+        self.pages = 0
+
+    def maybe_recycle(self):
+        reason = self.recycle_reason()
+        if reason:
+            self.recycle(reason)
+            return True
+        return False
+
+    def page_done(self):
+        self.pages += 1
+
+    def report_failure(self, error):
+        self.failures.append(error)
+        self._suspect = True
+
+    def quit(self):
+        pass
+
+
+@pytest.fixture
+def logger():
+    return logging.getLogger("tests")
+
+
+@pytest.fixture
+def place_url():
+    return PLACE_URL
+
+
+@pytest.fixture
+def place_html():
+    """HTML of a place page with an address and a rating; `extra` is added to its body."""
+    return lambda extra="": PLACE_HTML.format(extra=extra)
+
+
+@pytest.fixture
+def fake_driver():
+    return FakeDriver
+
+
+@pytest.fixture
+def fake_watchdog():
+    return FakeWatchdog
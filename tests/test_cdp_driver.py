@@ -0,0 +1,112 @@
+import asyncio
+import json
+
+import pytest
+from selenium.common.exceptions import WebDriverException
+
+from config import settings
+from scraper.cdp_driver import CDPScraper
+from scraper.pacing import PacingController
+from scraper.retry_queue import RetryQueue
+
+
+class FakeBrowser:
+    """CDPBrowser stand-in: pages render `html` for any URL after `load_sec`."""
+
+    def __init__(self, html, load_sec=0.01, fail=()):
+        self.html = html
+        self.load_sec = load_sec
+        self.fail = set(fail)
+        self.opened = 0
+        self.loading = 0
+        self.max_loading = 0
+
+    async def new_page(self):
+        self.opened += 1
+        return FakePage(self)
+
+
+class FakePage:
+    def __init__(self, browser):
+        self.browser = browser
+        self.current_url = "about:blank"
+        self.title = ""
+        self.scroll_height = 0
+
+    async def get(self, url, timeout=None):
+        browser = self.browser
+        browser.loading += 1
+        browser.max_loading = max(browser.max_loading, browser.loading)
+        try:
+            await asyncio.sleep(browser.load_sec)
+        finally:
+            browser.loading -= 1
+        if url in browser.fail:
+            browser.fail.discard(url)
+            raise WebDriverException("Target crashed")
+        self.current_url = url
+
+    async def evaluate(self, expression, timeout=None):
+        # Scripts de ScrollManager, passés par BlockingPage : arguments JSON en fin d'expression
+        args = json.loads(expression[expression.rindex(".apply(null, ") + len(".apply(null, "):-1])
+        if "scrollBy" in expression:
+            if args[1]:
+                self.scroll_height += 1000
+            return self.scroll_height
+        if "data-insea-harvested" in expression:
+            return [{"name": f"Lieu {n}", "card": "4,5(12)", "cls": "hfpxzc",
+                     "href": f"https://www.google.com/maps/place/Lieu{n}/data=!3d33.{n}!4d-7.{n}"}
+                    for n in range(3)]
+        return True  # présence du feed
+
+    async def wait_for(self, selector, timeout):
+        pass
+
+    async def content(self):
+        return self.browser.html
+
+    async def close(self):
+        pass
+
+
+@pytest.fixture
+def cdp_scraper(tmp_path, monkeypatch, logger, place_html):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "out").mkdir()
+
+    def make(count=16, pages=8, fail=()):
+        scraper = CDPScraper("k", logger, pages=pages, pacing=PacingController(logger, initial_delay=0),
+                             retry_queue=RetryQueue("k", logger, str(tmp_path)), fields=["address"])
+        scraper.browser = FakeBrowser(place_html(), fail=fail)
+        scraper.links = [{"name": f"Lieu {n}", "href": f"https://www.google.com/maps/place/Lieu{n}"}
+                         for n in range(count)]
+        return scraper
+    return make
+
+
+def test_every_page_loads_from_the_start(cdp_scraper):
+    scraper = cdp_scraper(count=16, pages=8)
+    asyncio.run(scraper.scrape_places())
+
+    assert scraper.browser.max_loading == 8
+    assert len(scraper.info_scraper.results) == 16
+    assert scraper.info_scraper.results[0]["address"] == "1 rue des Écoles"
+
+
+def test_crashed_page_is_retried_and_replaced(cdp_scraper):
+    scraper = cdp_scraper(count=4, pages=2, fail=["https://www.google.com/maps/place/Lieu1"])
+    asyncio.run(scraper.scrape_places())
+
+    assert [e["link"]["name"] for e in scraper.retry_queue.pending.values()] == ["Lieu 1"]
+    assert len(scraper.info_scraper.results) == 3
+    assert scraper.browser.opened == 3  # un onglet neuf remplace celui qui a planté
+
+
+def test_links_are_collected_by_the_shared_scroll_loop(cdp_scraper, monkeypatch):
+    monkeypatch.setattr(settings, "MAX_SCROLL_LOOPS", 3)
+    monkeypatch.setattr(settings, "SCROLL_PAUSE_SEC", 0.001)
+    scraper = cdp_scraper()
+    asyncio.run(scraper.collect_links("https://www.google.com/maps/search/cafe"))
+
+    assert [link["name"] for link in scraper.links] == ["Lieu 0", "Lieu 1", "Lieu 2"]
+    assert scraper.links[1]["fingerprint"]
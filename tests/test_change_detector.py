@@ -0,0 +1,50 @@
+from scraper.change_detector import ChangeDetector
+from scraper.product_info_scraper import ProductInfoScraper
+
+
+def link(n, card="4,5(12)"):
+    name = f"Place {n}"
+    return {"name": name, "href": f"https://maps.test/place/{n}",
+            "fingerprint": ChangeDetector.listing_fingerprint(name, card)}
+
+
+def record(n, rating="4,5"):
+    return {"url": f"https://maps.test/place/{n}", "name": f"Place {n}", "rating": rating}
+
+
+def test_fingerprint_follows_card_rating_not_opening_hours():
+    base = ChangeDetector.listing_fingerprint("Café", "Café\n4,5(1 234)\nCafé · Ouvert")
+    assert base == ChangeDetector.listing_fingerprint("Café", "Café\n4,5(1 234)\nFermé · Ouvre à 8:00")
+    assert base != ChangeDetector.listing_fingerprint("Café", "Café\n4,6(1 234)\nCafé · Ouvert")
+    assert base != ChangeDetector.listing_fingerprint("Café", "Café\n4,5(1 235)\nCafé · Ouvert")
+
+
+def test_new_crawl_starts_empty_and_interrupted_run_resumes(tmp_path, logger):
+    links = [link(1), link(2)]
+    first = ProductInfoScraper(None, "k", logger, output_folder=str(tmp_path), links=links)
+    first.start_run()
+    first._save_one(record(1))
+
+    # Même liste, passage interrompu : on reprend
+    resumed = ProductInfoScraper(None, "k", logger, output_folder=str(tmp_path), links=links)
+    assert [r["url"] for r in resumed.results] == [links[0]["href"]]
+    resumed.finish_run()
+
+    # Passage terminé : le suivant repart de zéro, même sur la même liste
+    again = ProductInfoScraper(None, "k", logger, output_folder=str(tmp_path), links=links)
+    assert again.results == []
+    changed = ProductInfoScraper(None, "k", logger, output_folder=str(tmp_path),
+                                 links=[link(1, "4,6(13)"), link(2)])
+    assert changed.results == []
+
+
+def test_diff_reports_changed_and_removed_between_crawls(tmp_path, logger):
+    detector = ChangeDetector("k", logger, str(tmp_path))
+    detector.run([record(1), record(2), record(3)], listed=[record(n)["url"] for n in (1, 2, 3)])
+
+    # Place 1 changée, place 2 disparue de la liste, place 3 listée mais en échec
+    events = detector.run([record(1, "4,6")], listed=[record(1)["url"], record(3)["url"]])
+    ops = {e["url"]: e["op"] for e in events}
+    assert ops == {record(1)["url"]: "changed", record(2)["url"]: "removed"}
+    assert record(3)["url"] in detector.snapshot
+    assert record(2)["url"] not in detector.snapshot
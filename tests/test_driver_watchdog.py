@@ -0,0 +1,37 @@
+from urllib3.exceptions import MaxRetryError
+
+from scraper.driver_watchdog import DriverWatchdog
+
+
+class UnreachableDriver:
+    """Driver whose chromedriver is gone: commands fail below Selenium."""
+
+    def __init__(self):
+        self.quit_calls = 0
+
+    def set_page_load_timeout(self, timeout):
+        pass
+
+    def set_script_timeout(self, timeout):
+        pass
+
+    def execute_script(self, script, *args):
+        raise MaxRetryError(None, "/session/x/execute/sync", "Connection refused")
+
+    def quit(self):
+        self.quit_calls += 1
+
+
+def test_unreachable_driver_is_recycled_not_raised(logger):
+    drivers = []
+
+    def factory():
+        drivers.append(UnreachableDriver())
+        return drivers[-1]
+
+    watchdog = DriverWatchdog(logger, factory=factory, max_pages=100)
+    watchdog.report_failure(MaxRetryError(None, "/session/x/url"))
+    assert watchdog.is_alive() is False
+    assert watchdog.maybe_recycle() is True
+    assert len(drivers) == 2 and drivers[0].quit_calls == 1
+    assert watchdog.driver is drivers[1]
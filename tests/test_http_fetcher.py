@@ -0,0 +1,37 @@
+from pathlib import Path
+
+from scraper.http_fetcher import parse_place_html
+from scraper.product_normalizer import ProductNormalizer
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+def fixture(name):
+    return (FIXTURES / name).read_text(encoding="utf-8")
+
+
+def test_parse_full_place():
+    assert parse_place_html(fixture("place_full.html")) == {
+        "address": "12 Rue Tarik Ibn Ziad, Casablanca 20250",
+        "phone": "05 22 12 34 56",
+        "authority": "https://cafe-atlas.ma/",
+        "rating": "4,5",
+        "number_of_rates": "(1234)",
+    }
+
+
+def test_parse_returns_only_found_fields():
+    # Ni site ni avis : ces champs sont laissés à Selenium, pas fixés à ""
+    assert parse_place_html(fixture("place_no_website_no_reviews.html")) == {
+        "address": "Derb Sultan, Casablanca",
+    }
+
+
+def test_parse_page_without_state():
+    assert parse_place_html(fixture("consent.html")) is None
+
+
+def test_review_count_has_one_format():
+    assert ProductNormalizer.rates_count(1234) == "(1234)"
+    assert ProductNormalizer.rates_count("(1 234)") == "(1234)"
+    assert ProductNormalizer.rates_count("") == ""
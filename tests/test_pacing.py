@@ -0,0 +1,14 @@
+import threading
+import time
+
+from scraper.pacing import PacingController
+
+
+def test_stop_event_cuts_pause_and_cooldown_short():
+    stop_event = threading.Event()
+    pacing = PacingController(initial_delay=30, stop_event=stop_event)
+    threading.Timer(0.05, stop_event.set).start()
+    started = time.monotonic()
+    pacing.cooldown()
+    pacing.pause()
+    assert time.monotonic() - started < 5
@@ -0,0 +1,145 @@
+from selenium.common.exceptions import WebDriverException
+
+from scraper.change_detector import ChangeDetector
+from scraper.pacing import PacingController
+from scraper.product_info_scraper import ProductInfoScraper
+from scraper.retry_queue import RetryQueue
+
+
+def make_scraper(tmp_path, logger, driver=None, **kwargs):
+    kwargs.setdefault("links", [])
+    scraper = ProductInfoScraper(driver, "k", logger, output_folder=str(tmp_path),
+                                 pacing=PacingController.offline(logger), **kwargs)
+    scraper.poll_frequency = 0.001
+    return scraper
+
+
+def extract(scraper):
+    data = {"url": scraper.driver.current_url, "name": "Café"}
+    scraper.wait_ready(scraper.sections)
+    scraper.extract_current(data, scraper.sections)
+    return data, scraper._flag_completeness(data)
+
+
+def test_fields_the_place_lacks_are_settled(tmp_path, logger, fake_driver, place_html):
+    data, redo = extract(make_scraper(tmp_path, logger, fake_driver(place_html())))
+    assert redo == []
+    assert data["complete"] is True
+    assert data["address"] == "1 rue des Écoles"
+    assert data["phone"] == data["authority"] == ""
+    assert data["details"] == []
+
+
+def test_field_lost_to_a_timeout_is_missing(tmp_path, logger, fake_driver, place_html):
+    # Élément présent mais texte jamais affiché, et pas de numéro dans l'identifiant
+    html = place_html('<button data-item-id="phone:tel"></button>')
+    data, redo = extract(make_scraper(tmp_path, logger, fake_driver(html)))
+    assert redo == ["contacts"]
+    assert data["missing_fields"] == ["phone"]
+    assert data["complete"] is False
+
+
+def tab_scraper(tmp_path, logger, watchdog, count=8, tabs=4):
+    url = watchdog.driver.current_url
+    links = [{"name": f"Place {n}", "href": f"{url}&n={n}"} for n in range(count)]
+    return make_scraper(tmp_path, logger, links=links, tabs=tabs, watchdog=watchdog,
+                        retry_queue=RetryQueue("k", logger, str(tmp_path)))
+
+
+def test_tab_mode_recycles_once_tabs_are_drained(tmp_path, logger, fake_driver, fake_watchdog, place_html):
+    watchdog = fake_watchdog(fake_driver(place_html()), recycle_after=3)
+    scraper = tab_scraper(tmp_path, logger, watchdog)
+    scraper.scrape_info()
+
+    assert watchdog.recycled == [0]  # aucun chargement en vol au moment du recyclage
+    assert len(scraper.results) == 8
+
+
+def test_tab_mode_dead_session_reaches_watchdog(tmp_path, logger, fake_driver, fake_watchdog, place_html):
+    watchdog = fake_watchdog(fake_driver(place_html()))
+    scraper = tab_scraper(tmp_path, logger, watchdog, count=2)
+    scraper.retry_queue = None
+
+    def start_then_die(handle, data):
+        watchdog.driver.dead = True  # la session meurt pendant le chargement
+        return 0.0
+    scraper._start_load = start_then_die
+    scraper._scrape_with_tabs()
+
+    assert len(watchdog.failures) == 2
+    assert scraper.results == []
+
+
+def test_tab_mode_uses_every_tab_from_the_start(tmp_path, logger, fake_driver, fake_watchdog, place_html):
+    watchdog = fake_watchdog(fake_driver(place_html()))
+    scraper = tab_scraper(tmp_path, logger, watchdog, count=8, tabs=4)
+    loading = []  # chargements en vol à chaque collecte
+
+    def collect(data, sections, started, navigate=None):
+        loading.append(watchdog.driver.loads - len(loading))
+    scraper._collect = collect
+    scraper._scrape_with_tabs()
+
+    assert max(loading) == 4
+
+
+def test_tab_mode_failed_load_is_retried_and_reported(tmp_path, logger, fake_driver, fake_watchdog, place_html):
+    watchdog = fake_watchdog(fake_driver(place_html()))
+    scraper = tab_scraper(tmp_path, logger, watchdog, count=8)
+    start_load = scraper._start_load
+
+    def fail_once(handle, data):
+        if not watchdog.failures and not watchdog.recycled:
+            watchdog.driver.dead = True
+            raise WebDriverException("onglet planté")
+        return start_load(handle, data)
+    scraper._start_load = fail_once
+    scraper._scrape_with_tabs()
+
+    # Le navigateur est recyclé avant de lancer les liens suivants dans la session morte
+    assert len(watchdog.failures) == 1
+    assert len(watchdog.recycled) == 1
+    assert [e["link"]["href"] for e in scraper.retry_queue.pending.values()] == [scraper.links[0]["href"]]
+    assert len(scraper.results) == 7
+
+
+class FakeFetcher:
+    FIELDS = ("address", "phone", "authority", "rating", "number_of_rates")
+
+    def __init__(self):
+        self.calls = 0
+
+    def fetch(self, href):
+        self.calls += 1
+        return {"address": "1 rue des Écoles", "phone": "05 22 12 34 56", "rating": "4,5"}
+
+
+def test_http_fetch_skipped_without_http_field(tmp_path, logger, place_url):
+    for fields in (["details"], ["name"]):
+        scraper = make_scraper(tmp_path, logger, http_fetcher=FakeFetcher(), fields=fields)
+        scraper._prepare(1, {"name": "Café", "href": place_url})
+        assert scraper.http_fetcher.calls == 0
+
+
+def test_http_fetch_keeps_only_requested_fields(tmp_path, logger, place_url):
+    scraper = make_scraper(tmp_path, logger, http_fetcher=FakeFetcher(), fields=["phone"])
+    assert scraper._prepare(1, {"name": "Café", "href": place_url}) is None
+    assert scraper.http_fetcher.calls == 1
+    record = scraper.results[0]
+    assert record["phone"] == "05 22 12 34 56"
+    assert "address" not in record and "rating" not in record
+
+
+def test_incomplete_cached_record_rescrapes_its_missing_fields(tmp_path, logger, place_url):
+    detector = ChangeDetector("k", logger, str(tmp_path))
+    detector.snapshot[place_url] = {"fingerprint": "f", "raw": {
+        "url": place_url, "name": "Café", "address": "1 rue des Écoles", "rating": "4,5",
+        "missing_fields": ["phone"], "complete": False,
+    }}
+    scraper = make_scraper(tmp_path, logger, change_detector=detector, fields=["address", "phone", "rating"])
+    job = scraper._prepare(1, {"name": "Café", "href": place_url, "fingerprint": "f"})
+
+    assert job is not None and scraper.results == []
+    data, sections = job
+    assert sections == ["contacts"]
+    assert data["address"] == "1 rue des Écoles" and "phone" not in data
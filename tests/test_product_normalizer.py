@@ -0,0 +1,15 @@
+from scraper.product_normalizer import ProductNormalizer
+
+
+def normalize(product, fields=None):
+    return ProductNormalizer("unused.json", fields=fields).normalize_product(product)
+
+
+def test_review_count_kept_when_rating_not_projected():
+    assert normalize({"name": "Café", "number_of_rates": "1 234"}, fields=["number_of_rates"]) == \
+        {"name": "Café", "number_of_rates": "(1234)"}
+
+
+def test_numeric_review_count_stands_in_for_missing_rating():
+    record = normalize({"name": "Café", "rating": "", "number_of_rates": "4,5"}, fields=["rating", "number_of_rates"])
+    assert record == {"name": "Café", "rating": "4,5", "number_of_rates": ""}
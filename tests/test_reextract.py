@@ -0,0 +1,36 @@
+import pytest
+from selenium.common.exceptions import WebDriverException
+
+from scraper import reextract
+from scraper.change_detector import ChangeDetector
+from scraper.offline_dom import OfflineDriver
+from scraper.snapshot_store import SnapshotStore
+
+FEED = """<html><body><div role="feed">
+<div class="Nv2PK"><a class="hfpxzc" aria-label="Café" href="{url}"></a>
+<div>Café</div><div>4,5(12)</div><div>Café · Ouvert</div></div>
+</div></body></html>"""
+
+
+def test_offline_driver_has_no_javascript(place_url, place_html):
+    with pytest.raises(WebDriverException):
+        OfflineDriver(place_url, {"place": place_html()}).execute_script("return 1")
+
+
+def test_reextracted_record_matches_live_record(tmp_path, logger, place_url, place_html):
+    store = SnapshotStore(str(tmp_path), logger)
+    store.save("https://www.google.com/maps/search/cafe", FEED.format(url=place_url), "feed", key="cafe")
+    store.save(place_url, place_html(), "place", key="cafe", name="Café")
+
+    links = reextract.reextract_links(store, "cafe")
+    reextract._init_worker(str(tmp_path))
+    fingerprint = links[0]["fingerprint"]
+    record = reextract._reextract_place((place_url, store.latest("cafe")[place_url], fingerprint))
+
+    assert fingerprint == ChangeDetector.listing_fingerprint("Café", "Café\n4,5(12)")
+    assert record == {
+        "url": place_url, "name": "Café", "fingerprint": fingerprint, "lat": 33.5731, "lng": -7.5898,
+        "address": "1 rue des Écoles", "phone": "", "authority": "",
+        "rating": "4,5", "number_of_rates": "(12)", "details": [],
+        "missing_fields": [], "complete": True,
+    }
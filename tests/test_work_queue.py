@@ -0,0 +1,55 @@
+import multiprocessing
+import os
+import sqlite3
+
+from config import settings
+from scraper import driver_watchdog
+from scraper.pacing import PacingController
+from scraper.work_queue import open_backend
+from scraper.worker import QueueWorker
+
+
+def work(queue_url, worker_id, crash, make_watchdog):
+    driver_watchdog.DriverWatchdog = lambda logger: make_watchdog()
+    worker = QueueWorker(queue_url, "job", worker_id, fields=["address"])
+    worker.info_scraper.pacing = PacingController.offline()
+    worker.info_scraper.poll_frequency = 0.001
+    if crash:
+        def crash_holding_lease(payload):
+            os._exit(1)  # ni ack ni nack : seul l'expiration du lease rend l'élément
+        worker.process_place = crash_holding_lease
+    worker.run(exit_when_empty=True)
+
+
+def test_items_of_a_crashed_worker_are_released_and_completed(tmp_path, monkeypatch, fake_driver,
+                                                             fake_watchdog, place_html):
+    monkeypatch.setattr(settings, "OUTPUT_DIR", tmp_path)
+    monkeypatch.setattr(settings, "QUEUE_LEASE_SEC", 1)
+    monkeypatch.setattr(settings, "QUEUE_HEARTBEAT_SEC", 0.2)
+    monkeypatch.setattr(settings, "QUEUE_POLL_SEC", 0.1)
+    path = tmp_path / "queue.db"
+    queue_url = f"sqlite:///{path}"
+    queue, result_store = open_backend(queue_url)
+    places = [{"name": f"Lieu {n}", "href": f"https://maps.test/place/{n}"} for n in range(200)]
+    assert queue.put("job", "place", places) == 200
+
+    def make_watchdog():
+        return fake_watchdog(fake_driver(place_html()))
+
+    context = multiprocessing.get_context("fork")
+    workers = [context.Process(target=work, args=(queue_url, f"w{n}", n == 0, make_watchdog))
+               for n in range(4)]
+    # w0 meurt avec un lease en main avant que les autres ne démarrent
+    workers[0].start()
+    workers[0].join(60)
+    for process in workers[1:]:
+        process.start()
+    for process in workers[1:]:
+        process.join(60)
+    assert [process.exitcode for process in workers] == [1, 0, 0, 0]
+
+    assert queue.stats("job") == {"place": {"done": 200}}
+    assert {r["url"] for r in result_store.records("job")} == {p["href"] for p in places}
+    with sqlite3.connect(path) as conn:
+        reclaimed = conn.execute("SELECT worker, attempts FROM queue WHERE attempts > 1").fetchall()
+    assert len(reclaimed) == 1 and reclaimed[0][0] != "w0"